@@ -209,8 +209,8 @@ class AURALangchainUAgentsSystem:
                 response = ResponseMessage(
                     success=result.success,
                     data={
-                        "threat_level": result.analysis.overall_threat_level.value if result.analysis else "UNKNOWN",
-                        "threat_types": [t.value for t in result.analysis.threat_types] if result.analysis else [],
+                        "threat_level": result.analysis.overall_threat_level if result.analysis else "UNKNOWN",
+                        "threat_types": list(result.analysis.threat_types) if result.analysis else [],
                         "processing_time": result.processing_time_ms
                     },
                     message=result.message
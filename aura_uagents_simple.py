@@ -157,8 +157,8 @@ class AURAUAgentsSystem:
                 # Convert response
                 response = ThreatAnalysisResponse(
                     success=result.success,
-                    threat_level=result.analysis.overall_threat_level.value if result.analysis else "UNKNOWN",
-                    threat_types=[t.value for t in result.analysis.threat_types] if result.analysis else [],
+                    threat_level=result.analysis.overall_threat_level if result.analysis else "UNKNOWN",
+                    threat_types=list(result.analysis.threat_types) if result.analysis else [],
                     message=result.message
                 )
                 
@@ -114,7 +114,7 @@ class DemoAURASystem:
                 home_actions = 0
                 
                 if result.get("threat_analysis"):
-                    threat_level = result["threat_analysis"].overall_threat_level.value
+                    threat_level = result["threat_analysis"].overall_threat_level
                 
                 if result.get("home_actions"):
                     home_actions = len(result["home_actions"])
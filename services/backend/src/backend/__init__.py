@@ -13,7 +13,7 @@ from .models import (
     SmartHomeAlert, AlertResponse, HomeStatus, HomeStatusResponse,
     SimulationRequest, WeatherEvent
 )
-from .voice_alerts import AURAVoiceService
+from .voice_alerts import AURAVoiceService, get_voice_service, close_client as close_voice_client
 from .smart_home_simulator import SmartHomeSimulator
 # FastAPI routers for AURA APIs
 from .home_state_api import router as home_state_router
@@ -62,7 +62,7 @@ agent_orchestrator = None
 async def startup_event():
     global voice_service, simulator, agent_orchestrator
     try:
-        voice_service = AURAVoiceService()
+        voice_service = get_voice_service()
         simulator = SmartHomeSimulator(home_status_ref=home_status)
         
         # Initialize agent orchestrator
@@ -79,6 +79,11 @@ async def startup_event():
         # Continue without agents if they fail to initialize
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_voice_client()
+
+
 @app.get("/")
 async def root():
     return {"message": "AURA Smart Home Management API", "status": "running"}
@@ -1,6 +1,7 @@
 import asyncio
+import re
 import time
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
 
@@ -8,9 +9,9 @@ from .threat_assessment_agent import ThreatAssessmentAgent
 from .threat_models import ThreatAnalysisRequest, ThreatAnalysisResult, ThreatLevel, ThreatType, MockDataConfig
 from .home_state_agent import HomeStateAgent
 from .home_state_models import HomeStateRequest, Action, DeviceType, ActionType
-from .api_clients import MockDataClient
-from .voice_alerts import AURAVoiceService
-from .agentverse_voice_service import AURAVoiceService as AgentverseVoiceService
+from .api_clients import get_mock_client
+from .voice_alerts import get_voice_service, close_client, to_e164
+from .agentverse_voice_service import get_agentverse_voice_service
 from .models import HomeownerRegistration, RegisteredHomeowner, SmartHomeAlert, WeatherEvent
 
 
@@ -25,9 +26,12 @@ class AgentOrchestrator:
     4. Results are returned showing the complete threat-to-action flow
     """
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, max_call_concurrency: int = 10):
         self.openai_api_key = openai_api_key
         
+        # Upper bound on simultaneous outbound VAPI calls during homeowner fan-out
+        self.max_call_concurrency = max_call_concurrency
+        
         # Initialize agents with mock data by default
         mock_config = MockDataConfig(
             use_mock_weather=False,
@@ -43,47 +47,90 @@ class AgentOrchestrator:
         self.home_agent = HomeStateAgent(openai_api_key=openai_api_key)
         
         # Initialize voice service for phone calls
-        self.voice_service = AURAVoiceService()
+        self.voice_service = get_voice_service()
         
         # Initialize agentverse voice service for permission/completion calls
-        self.agentverse_voice_service = AgentverseVoiceService()
+        self.agentverse_voice_service = get_agentverse_voice_service()
         
         # Initialize mock data client for enhanced scenarios
-        self.mock_client = MockDataClient(data_dir="data")
+        self.mock_client = get_mock_client()
         
         # Registered homeowners for phone calls
         self.registered_homeowners: Dict[str, RegisteredHomeowner] = {}
         
         # Threat-to-action mapping rules
         self.threat_action_mapping = self._initialize_threat_action_mapping()
+        
+        # AgentVerse message commands, keyed by first word
+        self._command_table = {
+            "register": self._handle_register,
+            "status": self._handle_status,
+            "home": self._handle_status,
+            "homeowners": self._handle_homeowners,
+            "registered": self._handle_homeowners,
+            "simulate": self._handle_simulate,
+            "reset": self._handle_reset,
+            "help": self._handle_help,
+        }
+        
+        self._initialized = False
     
     async def initialize(self):
-        """Initialize both agents"""
+        """Initialize both agents; repeated calls are no-ops"""
+        if self._initialized:
+            return
+        self._initialized = True
         print("🔄 Initializing Agent Orchestrator...")
         print("   ✅ Threat Assessment Agent (The Oracle) - Ready")
         print("   ✅ Home State Agent (Digital Twin) - Ready")
         print("   ✅ Voice Service - Ready")
         print("   ✅ Agent Orchestrator - Ready")
     
+    async def aclose(self):
+        """
+        Release the threat agent's API sessions and the shared voice client.
+        The app never exits its orchestrator and closes the voice client in its own
+        shutdown hook; close_client is idempotent and the client is recreated on next use.
+        """
+        await self.threat_agent.close()
+        await close_client()
+    
+    async def __aenter__(self):
+        """Initialize on entry so `async with AgentOrchestrator() as o:` is ready to use"""
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
     async def register_homeowner(self, registration: HomeownerRegistration) -> Dict[str, Any]:
         """Register a new homeowner for phone call alerts"""
         try:
+            # Normalize once here so every later call uses the stored E.164 number
+            try:
+                phone_number = to_e164(registration.phone_number)
+            except ValueError as e:
+                return {
+                    "success": False,
+                    "message": str(e)
+                }
+            
             # Check if phone number already registered
-            if registration.phone_number in self.registered_homeowners:
+            if phone_number in self.registered_homeowners:
                 return {
                     "success": False,
-                    "message": f"Phone number {registration.phone_number} is already registered"
+                    "message": f"Phone number {phone_number} is already registered"
                 }
             
             # Create new homeowner
             homeowner = RegisteredHomeowner(
                 id=str(int(time.time())),
                 name=registration.name,
-                phone_number=registration.phone_number,
+                phone_number=phone_number,
                 registered_at=datetime.utcnow()
             )
             
-            self.registered_homeowners[registration.phone_number] = homeowner
+            self.registered_homeowners[phone_number] = homeowner
             
             print(f"✅ Registered homeowner: {homeowner.name} ({homeowner.phone_number})")
             
@@ -162,16 +209,9 @@ class AgentOrchestrator:
                 }
             
             # Send warning calls to all homeowners
-            warning_results = []
-            for phone_number, homeowner in self.registered_homeowners.items():
-                print(f"📞 Sending warning call to {homeowner.name} ({phone_number})")
-                result = self.agentverse_voice_service.send_warning_call(phone_number, homeowner.name)
-                warning_results.append({
-                    "homeowner": homeowner.name,
-                    "phone_number": phone_number,
-                    "success": result.success,
-                    "call_id": result.call_id
-                })
+            warning_results = await self._call_homeowners(
+                "warning", lambda phone_number, homeowner: self.agentverse_voice_service.send_warning_call(phone_number, homeowner.name)
+            )
             
             # Wait for warning calls to be answered (30 seconds)
             print("⏳ Waiting for warning calls to be answered...")
@@ -231,50 +271,9 @@ class AgentOrchestrator:
                 "message": f"Error resetting simulation: {str(e)}"
             }
     
-    async def handle_message(self, message: dict) -> dict:
-        """Handle incoming messages from AgentVerse"""
-        try:
-            content = message.get("content", "").lower()
-            
-            # Parse command
-            if "register" in content and "homeowner" in content:
-                # Extract name and phone number from message
-                parts = content.split()
-                name = "Unknown"
-                phone = None
-                
-                for i, part in enumerate(parts):
-                    if part.isdigit() and len(part) >= 10:
-                        phone = part
-                        if i > 0:
-                            name = parts[i-1]
-                        break
-                
-                if phone:
-                    registration = HomeownerRegistration(name=name, phone_number=phone)
-                    result = await self.register_homeowner(registration)
-                    response_content = f"Registration: {result['message']}"
-                else:
-                    response_content = "Please provide a valid phone number for registration"
-            
-            elif "status" in content or "home status" in content:
-                result = await self.get_home_status()
-                response_content = f"Home Status: {result['message']}\nData: {result.get('data', {})}"
-            
-            elif "homeowners" in content or "registered" in content:
-                result = await self.get_registered_homeowners()
-                response_content = f"Homeowners: {result['message']}\nData: {result.get('homeowners', [])}"
-            
-            elif "simulate" in content and "heatwave" in content:
-                result = await self.simulate_heatwave()
-                response_content = f"Simulation: {result['message']}\nData: {result.get('data', {})}"
-            
-            elif "reset" in content:
-                result = await self.reset_simulation()
-                response_content = f"Reset: {result['message']}"
-            
-            else:
-                response_content = """
+    _REGISTER_RE = re.compile(r"register\s+homeowner\s+(\S+)\s+(\+?\d{10,15})\b", re.IGNORECASE)
+    
+    _HELP_TEXT = """
 AURA Smart Home Management Agent Commands:
 - Register homeowner: "register homeowner [name] [phone]"
 - Get home status: "status" or "home status"
@@ -284,6 +283,16 @@ AURA Smart Home Management Agent Commands:
 
 Example: "register homeowner John +1234567890"
                 """
+    
+    async def handle_message(self, message: dict) -> dict:
+        """Handle incoming messages from AgentVerse"""
+        try:
+            content = message.get("content", "").strip()
+            
+            # Dispatch on the first word; anything unrecognized gets the help text
+            command = content.partition(" ")[0].lower()
+            handler = self._command_table.get(command, self._handle_help)
+            response_content = await handler(content)
             
             return {
                 "success": True,
@@ -300,6 +309,71 @@ Example: "register homeowner John +1234567890"
                 "target": message.get("source", "agentverse")
             }
     
+    async def _handle_register(self, content: str) -> str:
+        match = self._REGISTER_RE.search(content)
+        if not match:
+            return "Please provide a valid phone number for registration"
+        name, phone = match.groups()
+        registration = HomeownerRegistration(name=name, phone_number=phone)
+        result = await self.register_homeowner(registration)
+        return f"Registration: {result['message']}"
+    
+    async def _handle_status(self, content: str) -> str:
+        result = await self.get_home_status()
+        return f"Home Status: {result['message']}\nData: {result.get('data', {})}"
+    
+    async def _handle_homeowners(self, content: str) -> str:
+        result = await self.get_registered_homeowners()
+        return f"Homeowners: {result['message']}\nData: {result.get('homeowners', [])}"
+    
+    async def _handle_simulate(self, content: str) -> str:
+        result = await self.simulate_heatwave()
+        return f"Simulation: {result['message']}\nData: {result.get('data', {})}"
+    
+    async def _handle_reset(self, content: str) -> str:
+        result = await self.reset_simulation()
+        return f"Reset: {result['message']}"
+    
+    async def _handle_help(self, content: str) -> str:
+        return self._HELP_TEXT
+    
+    async def _call_homeowners(
+        self, kind: str, place_call: Callable[[str, RegisteredHomeowner], Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Place one call per registered homeowner, at most max_call_concurrency at a time.
+        The VAPI client is blocking, so each call runs on a worker thread; a failed call
+        is reported in its own entry instead of aborting the batch.
+        """
+        semaphore = asyncio.Semaphore(self.max_call_concurrency)
+        homeowners = list(self.registered_homeowners.items())
+        
+        async def _one(phone_number: str, homeowner: RegisteredHomeowner):
+            async with semaphore:
+                print(f"📞 Sending {kind} call to {homeowner.name} ({phone_number})")
+                return await asyncio.to_thread(place_call, phone_number, homeowner)
+        
+        results = await asyncio.gather(
+            *(_one(phone_number, homeowner) for phone_number, homeowner in homeowners),
+            return_exceptions=True
+        )
+        return [
+            {
+                "homeowner": homeowner.name,
+                "phone_number": phone_number,
+                "success": False,
+                "call_id": None,
+                "message": f"Error sending {kind} call: {str(result)}"
+            } if isinstance(result, Exception) else {
+                "homeowner": homeowner.name,
+                "phone_number": phone_number,
+                "success": result.success,
+                "call_id": result.call_id,
+                "message": result.message
+            }
+            for (phone_number, homeowner), result in zip(homeowners, results)
+        ]
+    
     async def send_permission_calls(self) -> Dict[str, Any]:
         """Send permission calls to all registered homeowners"""
         try:
@@ -312,17 +386,9 @@ Example: "register homeowner John +1234567890"
             
             print(f"📞 Sending permission calls to {len(self.registered_homeowners)} homeowners")
             
-            call_results = []
-            for phone_number, homeowner in self.registered_homeowners.items():
-                print(f"📞 Sending permission call to {homeowner.name} ({phone_number})")
-                result = self.agentverse_voice_service.send_warning_call(phone_number, homeowner.name)
-                call_results.append({
-                    "homeowner": homeowner.name,
-                    "phone_number": phone_number,
-                    "success": result.success,
-                    "call_id": result.call_id,
-                    "message": result.message
-                })
+            call_results = await self._call_homeowners(
+                "permission", lambda phone_number, homeowner: self.agentverse_voice_service.send_warning_call(phone_number, homeowner.name)
+            )
             
             return {
                 "success": True,
@@ -349,17 +415,9 @@ Example: "register homeowner John +1234567890"
             
             print(f"📞 Sending completion calls to {len(self.registered_homeowners)} homeowners")
             
-            call_results = []
-            for phone_number, homeowner in self.registered_homeowners.items():
-                print(f"📞 Sending completion call to {homeowner.name} ({phone_number})")
-                result = self.agentverse_voice_service.send_resolution_call(phone_number, profit)
-                call_results.append({
-                    "homeowner": homeowner.name,
-                    "phone_number": phone_number,
-                    "success": result.success,
-                    "call_id": result.call_id,
-                    "message": result.message
-                })
+            call_results = await self._call_homeowners(
+                "completion", lambda phone_number, homeowner: self.agentverse_voice_service.send_resolution_call(phone_number, profit)
+            )
             
             return {
                 "success": True,
@@ -553,13 +611,15 @@ Example: "register homeowner John +1234567890"
                 weather_event = WeatherEvent(
                     event_type="heatwave" if ThreatType.HEAT_WAVE in threat_result.analysis.threat_types else "storm",
                     probability=threat_result.analysis.confidence_score * 100,
-                    severity=threat_result.analysis.overall_threat_level.value,
+                    severity=threat_result.analysis.overall_threat_level,
                     predicted_time="4 PM today",
                     description=f"Our analyst agents have detected a {threat_result.analysis.confidence_score*100:.0f}% probability of a grid-straining heatwave event at 4 pm today."
                 )
                 
-                # Send warning calls to all registered homeowners
-                for phone_number, homeowner in self.registered_homeowners.items():
+                # Send warning calls to all registered homeowners concurrently
+                recipients = list(self.registered_homeowners.items())
+                alerts_phones = []
+                for phone_number, homeowner in recipients:
                     alert = SmartHomeAlert(
                         alert_type="warning",
                         weather_event=weather_event,
@@ -567,9 +627,11 @@ Example: "register homeowner John +1234567890"
                         action_required=True,
                         homeowner_consent=False
                     )
-                    
                     print(f"📞 Sending warning call to {homeowner.name} ({phone_number})")
-                    call_result = await self.voice_service.send_warning_call(alert, phone_number)
+                    alerts_phones.append((alert, phone_number))
+                
+                call_results = await self.voice_service.send_warning_calls_bulk(alerts_phones)
+                for (phone_number, homeowner), call_result in zip(recipients, call_results):
                     warning_calls.append({
                         "homeowner": homeowner.name,
                         "phone_number": phone_number,
@@ -3,6 +3,7 @@ Voice service for AURA Smart Home Management Agent
 Handles VAPI integration for voice calls
 """
 
+import functools
 import os
 import json
 import requests
@@ -28,14 +29,7 @@ class AURAVoiceService:
             print("✅ VAPI configured - real voice calls enabled")
     
     def send_warning_call(self, phone_number: str, homeowner_name: str = "Homeowner") -> VoiceCallResponse:
-        """Send a warning call about weather event"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
+        """Send a warning call about weather event; phone_number must already be E.164 (see voice_alerts.to_e164)"""
         
         message = f"This is AURA. Our analyst agents have detected a 92% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?"
         
@@ -51,14 +45,7 @@ class AURAVoiceService:
         return self._make_vapi_call(phone_number, message, "warning")
     
     def send_resolution_call(self, phone_number: str, profit: float = 4.15) -> VoiceCallResponse:
-        """Send a resolution call with final report"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
+        """Send a resolution call with final report; phone_number must already be E.164 (see voice_alerts.to_e164)"""
         
         message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${profit:.2f}. The situation is managed."
         
@@ -129,3 +116,9 @@ class AURAVoiceService:
                 success=False,
                 message=error_msg
             )
+
+
+@functools.lru_cache(maxsize=1)
+def get_agentverse_voice_service() -> AURAVoiceService:
+    """Return the process-wide AURAVoiceService, created on first use"""
+    return AURAVoiceService()
@@ -9,8 +9,12 @@ and recommendations for smart home energy management.
 
 import asyncio
 import aiohttp
+import functools
 import os
+import random
+import time
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -27,7 +31,7 @@ except ImportError:
     from threat_models import WeatherData, GridData, APIError
 
 # Additional imports for MCP client
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
 import json
 import mcp
@@ -35,6 +39,57 @@ from mcp.client.stdio import stdio_client
 from anthropic import Anthropic
 
 
+def _new_session(timeout: aiohttp.ClientTimeout) -> aiohttp.ClientSession:
+    """
+    Create a keep-alive aiohttp session shared by all calls a client makes.
+    Idle connections are held for 60s so bursty requests reuse sockets instead
+    of paying a fresh TCP/TLS handshake each time.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=64,
+        limit_per_host=32,
+        keepalive_timeout=60.0,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+
+# Time-of-day bands for the realistic fallback generators, precomputed per hour
+# so each call is a single tuple index instead of an if/elif ladder.
+def _daypart(hour: int) -> str:
+    if 6 <= hour <= 9:
+        return "morning_peak"
+    if 17 <= hour <= 21:
+        return "evening_peak"
+    if 22 <= hour or hour <= 5:
+        return "night"
+    return "daytime"
+
+
+_DAYPART_BY_HOUR = tuple(_daypart(hour) for hour in range(24))
+
+# (base, max random addition)
+_DEMAND_BAND_BY_HOUR = tuple({
+    "morning_peak": (70000, 5000),
+    "evening_peak": (75000, 8000),
+    "night": (45000, 3000),
+    "daytime": (60000, 4000),
+}[part] for part in _DAYPART_BY_HOUR)
+
+_PRICE_BAND_BY_HOUR = tuple({
+    "morning_peak": (45, 20),
+    "evening_peak": (55, 30),
+    "night": (25, 10),
+    "daytime": (35, 15),
+}[part] for part in _DAYPART_BY_HOUR)
+
+# (system status, emergency condition or None)
+_STATUS_BY_HOUR = tuple({
+    "morning_peak": ("Moderate Load", None),
+    "evening_peak": ("High Load", "Peak demand period"),
+}.get(part, ("Normal", None)) for part in _DAYPART_BY_HOUR)
+
+
 # Data Models
 @dataclass
 class WeatherForecast:
@@ -113,6 +168,11 @@ class LiveGridData:
     source: str = "ercot"
 
 
+# Last validators (Last-Modified/ETag) and parsed current conditions per
+# coordinate, shared across client instances for conditional requests
+_CONDITIONAL_WEATHER_CACHE: Dict[Tuple[float, float], Tuple[Dict[str, str], Dict[str, Any]]] = {}
+
+
 class LiveWeatherClient:
     """OpenWeatherMap API client for live weather data"""
     
@@ -120,26 +180,31 @@ class LiveWeatherClient:
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5"
         self.nws_url = "https://api.weather.gov"
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=2.0, sock_read=10.0)
         self.session: Optional[aiohttp.ClientSession] = None
         
         if not self.api_key:
             raise ValueError("OpenWeatherMap API key is required")
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=self.timeout)
+        self.session = _new_session(self.timeout)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the underlying HTTP session and its pooled connections"""
         if self.session:
             await self.session.close()
+            self.session = None
     
     async def get_live_weather(self, location: str, lat: float, lon: float) -> LiveWeatherData:
         """
         Get comprehensive live weather data including current conditions, 6-hour forecast, and NWS alerts
         """
         if not self.session:
-            self.session = aiohttp.ClientSession(timeout=self.timeout)
+            self.session = _new_session(self.timeout)
         
         try:
             # Get current weather
@@ -179,13 +244,28 @@ class LiveWeatherClient:
             "units": "imperial"
         }
         
-        async with self.session.get(url, params=params) as response:
+        # Revalidate against the last response for this point so an unchanged
+        # observation comes back as a bodyless 304
+        cache_key = (lat, lon)
+        cached = _CONDITIONAL_WEATHER_CACHE.get(cache_key)
+        headers = {}
+        if cached:
+            validators, _ = cached
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+        
+        async with self.session.get(url, params=params, headers=headers) as response:
+            if response.status == 304 and cached:
+                return {**cached[1], "timestamp": datetime.utcnow()}
+            
             if response.status != 200:
                 raise APIError("openweathermap", f"Current weather request failed with status {response.status}", response.status)
             
             data = await response.json()
             
-            return {
+            current = {
                 "temp_f": data["main"]["temp"],
                 "condition": data["weather"][0]["description"].title(),
                 "humidity": data["main"]["humidity"],
@@ -193,6 +273,12 @@ class LiveWeatherClient:
                 "uv_index": None,  # UV index requires separate API call
                 "timestamp": datetime.utcnow()
             }
+            
+            validators = {name: response.headers[name] for name in ("Last-Modified", "ETag") if name in response.headers}
+            if validators:
+                _CONDITIONAL_WEATHER_CACHE[cache_key] = (validators, current)
+            
+            return current
     
     async def _get_6h_forecast(self, lat: float, lon: float) -> List[WeatherForecast]:
         """Get 6-hour weather forecast"""
@@ -270,7 +356,7 @@ class LiveERCOTClient:
         self.password = password
         self.subscription_key = subscription_key
         self.base_url = "https://api.ercot.com/api/v1"
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=2.0, sock_read=10.0)
         self.session: Optional[aiohttp.ClientSession] = None
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
@@ -278,13 +364,18 @@ class LiveERCOTClient:
         self._min_request_interval = 1.0  # 1 second between requests
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=self.timeout)
+        self.session = _new_session(self.timeout)
         await self._authenticate()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the underlying HTTP session and its pooled connections"""
         if self.session:
             await self.session.close()
+            self.session = None
     
     async def _authenticate(self):
         """Authenticate with ERCOT API using OAuth2"""
@@ -320,7 +411,7 @@ class LiveERCOTClient:
     async def get_live_grid_data(self) -> LiveGridData:
         """Get comprehensive live ERCOT grid data"""
         if not self.session:
-            self.session = aiohttp.ClientSession(timeout=self.timeout)
+            self.session = _new_session(self.timeout)
             await self._authenticate()
         
         try:
@@ -361,18 +452,9 @@ class LiveERCOTClient:
     
     def _create_realistic_demand_data(self) -> ERCOTDemandData:
         """Create realistic demand data based on current time"""
-        import random
-        now = datetime.now()
-        hour = now.hour
-        
-        if 6 <= hour <= 9:  # Morning peak
-            base_demand = 70000 + random.randint(0, 5000)
-        elif 17 <= hour <= 21:  # Evening peak
-            base_demand = 75000 + random.randint(0, 8000)
-        elif 22 <= hour or hour <= 5:  # Night low
-            base_demand = 45000 + random.randint(0, 3000)
-        else:  # Daytime
-            base_demand = 60000 + random.randint(0, 4000)
+        # Base demand varies by time of day
+        base, span = _DEMAND_BAND_BY_HOUR[datetime.now().hour]
+        base_demand = base + random.randint(0, span)
         
         variation = random.randint(-2000, 2000)
         current_demand = max(30000, base_demand + variation)
@@ -388,18 +470,9 @@ class LiveERCOTClient:
     
     def _create_realistic_price_data(self) -> ERCOTPriceData:
         """Create realistic price data based on current time"""
-        import random
-        now = datetime.now()
-        hour = now.hour
-        
-        if 6 <= hour <= 9:  # Morning peak
-            base_price = 45 + random.randint(0, 20)
-        elif 17 <= hour <= 21:  # Evening peak
-            base_price = 55 + random.randint(0, 30)
-        elif 22 <= hour or hour <= 5:  # Night low
-            base_price = 25 + random.randint(0, 10)
-        else:  # Daytime
-            base_price = 35 + random.randint(0, 15)
+        # Base price varies by time of day
+        base, span = _PRICE_BAND_BY_HOUR[datetime.now().hour]
+        base_price = base + random.randint(0, span)
         
         variation = random.randint(-10, 15)
         price = max(10, base_price + variation)
@@ -413,19 +486,8 @@ class LiveERCOTClient:
     
     def _create_realistic_status_data(self) -> ERCOTSystemStatus:
         """Create realistic system status data"""
-        import random
-        now = datetime.now()
-        hour = now.hour
-        
-        if 17 <= hour <= 21:  # Evening peak
-            system_status = "High Load"
-            emergency_conditions = ["Peak demand period"]
-        elif 6 <= hour <= 9:  # Morning peak
-            system_status = "Moderate Load"
-            emergency_conditions = []
-        else:
-            system_status = "Normal"
-            emergency_conditions = []
+        system_status, condition = _STATUS_BY_HOUR[datetime.now().hour]
+        emergency_conditions = [condition] if condition else []
         
         if random.random() < 0.1:  # 10% chance of some issue
             system_status = "Moderate Load"
@@ -663,6 +725,96 @@ def format_threat_analysis(analysis: Dict[str, Any]) -> str:
     return "\n".join(output)
 
 
+class AsyncClientPool:
+    """
+    Pool of entered async-context-manager clients, memoized per key.
+    
+    Each key (e.g. a location or balancing authority) maps to one long-lived
+    client instance that is entered once and reused across requests. Entries
+    idle for longer than ``ttl`` seconds are exited on the next ``get``.
+    """
+    
+    def __init__(self, factory, ttl: float = 300.0):
+        self.factory = factory
+        self.ttl = ttl
+        self._entries: Dict[Any, List[Any]] = {}  # key -> [client, last_used, active, ready]
+        self._lock = asyncio.Lock()
+    
+    @asynccontextmanager
+    async def get(self, key: Any = None):
+        """Borrow the pooled client for ``key``, creating and entering it on first use"""
+        async with self._lock:
+            evicted = self._evict_idle()
+            entry = self._entries.get(key)
+            creating = entry is None
+            if creating:
+                entry = [None, time.monotonic(), 0, asyncio.get_running_loop().create_future()]
+                self._entries[key] = entry
+            entry[2] += 1
+        try:
+            await self._exit_all(evicted)
+            # Entering a client can mean a network round trip (e.g. EIA auth), so it
+            # happens outside the lock; concurrent borrowers of the key wait on ``ready``
+            if creating:
+                await self._enter(key, entry)
+            else:
+                await asyncio.shield(entry[3])
+            yield entry[0]
+        finally:
+            entry[1] = time.monotonic()
+            entry[2] -= 1
+    
+    async def _enter(self, key: Any, entry: List[Any]):
+        ready = entry[3]
+        try:
+            client = self.factory()
+            await client.__aenter__()
+        except BaseException as e:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            if isinstance(e, asyncio.CancelledError):
+                ready.cancel()
+            else:
+                ready.set_exception(e)
+                ready.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        entry[0] = client
+        ready.set_result(None)
+    
+    def _evict_idle(self) -> List[Tuple[Any, Any]]:
+        """Drop idle entries from the pool and return them for the caller to exit"""
+        now = time.monotonic()
+        evicted = []
+        for key, (client, last_used, active, _) in list(self._entries.items()):
+            if active == 0 and now - last_used > self.ttl:
+                del self._entries[key]
+                evicted.append((key, client))
+        return evicted
+    
+    async def _exit_all(self, clients: List[Tuple[Any, Any]]):
+        for key, client in clients:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"Error closing pooled client for {key}: {e}")
+    
+    async def close(self):
+        """Exit every pooled client"""
+        async with self._lock:
+            entries, self._entries = self._entries, {}
+        await self._exit_all([
+            (key, client) for key, (client, _, _, ready) in entries.items()
+            if ready.done() and not ready.cancelled() and ready.exception() is None
+        ])
+
+
+# Current-weather responses keyed by normalized location. Conditions change on
+# the order of minutes, so repeat lookups within the TTL skip the upstream call.
+_WEATHER_CACHE_TTL = 60.0
+_WEATHER_CACHE_MAX = 128
+_WEATHER_CACHE: "OrderedDict[str, Tuple[float, WeatherData, Dict[str, Any]]]" = OrderedDict()
+
+
 class OpenWeatherMapClient:
     """OpenWeatherMap API client - Updated to use live weather monitor"""
     
@@ -685,9 +837,26 @@ class OpenWeatherMapClient:
     
     async def get_current_weather(self, location: str) -> WeatherData:
         """Get current weather data for a location using the live weather client"""
+        weather_data, _ = await self.get_current_weather_raw(location)
+        return weather_data
+    
+    async def get_current_weather_raw(self, location: str) -> Tuple[WeatherData, Dict[str, Any]]:
+        """
+        Get current weather as both a WeatherData model (for analysis) and a
+        dict built straight from the live response (for raw_data), so the response
+        does not need a second model serialization pass. The dict has the same
+        shape and types as WeatherData.dict(). Callers get their own copies of
+        both, so cached entries cannot be mutated through them.
+        """
         if not self.api_key:
             raise ValueError("OpenWeatherMap API key not available")
         
+        key = location.strip().lower()
+        cached = _WEATHER_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _WEATHER_CACHE_TTL:
+            _WEATHER_CACHE.move_to_end(key)
+            return cached[1].model_copy(), dict(cached[2])
+        
         try:
             # Austin, TX coordinates (default for this system)
             lat, lon = 30.2672, -97.7431
@@ -695,21 +864,48 @@ class OpenWeatherMapClient:
             # Use the live weather client
             live_data = await self.live_client.get_live_weather(location, lat, lon)
             
+            raw = {
+                "location": live_data.location,
+                "temperature_f": live_data.current_temperature_f,
+                "condition": live_data.condition,
+                "humidity_percent": live_data.humidity_percent,
+                "wind_speed_mph": live_data.wind_speed_mph,
+                "nws_alert": live_data.nws_alerts[0].title if live_data.nws_alerts else None,
+                "timestamp": live_data.timestamp,
+                "source": "openweathermap"
+            }
+            
             # Convert to the expected WeatherData format
-            return WeatherData(
-                location=live_data.location,
-                temperature_f=live_data.current_temperature_f,
-                condition=live_data.condition,
-                humidity_percent=live_data.humidity_percent,
-                wind_speed_mph=live_data.wind_speed_mph,
-                nws_alert=live_data.nws_alerts[0].title if live_data.nws_alerts else None,
+            weather_data = WeatherData(
+                location=raw["location"],
+                temperature_f=raw["temperature_f"],
+                condition=raw["condition"],
+                humidity_percent=raw["humidity_percent"],
+                wind_speed_mph=raw["wind_speed_mph"],
+                nws_alert=raw["nws_alert"],
                 timestamp=live_data.timestamp
             )
+            
+            _WEATHER_CACHE[key] = (time.monotonic(), weather_data, raw)
+            _WEATHER_CACHE.move_to_end(key)
+            while len(_WEATHER_CACHE) > _WEATHER_CACHE_MAX:
+                _WEATHER_CACHE.popitem(last=False)
+            return weather_data.model_copy(), dict(raw)
                 
         except Exception as e:
             raise ValueError(f"Failed to fetch weather data: {str(e)}")
 
 
+# Precomputed jitter for fallback grid data: (base demand fraction, demand variation,
+# frequency offset, reserve margin). Indexed by a single getrandbits draw so each call
+# is one cheap draw and a lookup instead of several RNG draws.
+_GRID_JITTER_BITS = 10
+_GRID_JITTER = [
+    (random.random(), random.randint(-2000, 2000), random.uniform(-0.1, 0.1), random.randint(3000, 8000))
+    for _ in range(1 << _GRID_JITTER_BITS)
+]
+
+
 class EIAClient:
     """Client for U.S. Energy Information Administration API - Updated to use live ERCOT monitor"""
     
@@ -764,32 +960,21 @@ class EIAClient:
     
     def _create_realistic_grid_data(self, balancing_authority: str) -> GridData:
         """Create realistic grid data when live APIs are unavailable"""
-        import random
-        from datetime import datetime
-        
-        now = datetime.now()
-        hour = now.hour
+        base_u, variation, frequency_offset, reserve_margin = _GRID_JITTER[random.getrandbits(_GRID_JITTER_BITS)]
         
         # Base demand varies by time of day
-        if 6 <= hour <= 9:  # Morning peak
-            base_demand = 70000 + random.randint(0, 5000)
-        elif 17 <= hour <= 21:  # Evening peak
-            base_demand = 75000 + random.randint(0, 8000)
-        elif 22 <= hour or hour <= 5:  # Night low
-            base_demand = 45000 + random.randint(0, 3000)
-        else:  # Daytime
-            base_demand = 60000 + random.randint(0, 4000)
+        base, span = _DEMAND_BAND_BY_HOUR[datetime.now().hour]
+        base_demand = base + int(base_u * (span + 1))
         
-        variation = random.randint(-2000, 2000)
         current_demand = max(30000, base_demand + variation)
         
         return GridData(
             balancing_authority=balancing_authority,
             timestamp_utc=datetime.utcnow(),
-            frequency_hz=60.0 + random.uniform(-0.1, 0.1),
+            frequency_hz=60.0 + frequency_offset,
             current_demand_mw=current_demand,
             status="Normal" if current_demand < 70000 else "High Load",
-            reserve_margin_mw=random.randint(3000, 8000)
+            reserve_margin_mw=reserve_margin
         )
 
 class PerplexityMCPClient:
@@ -1048,11 +1233,30 @@ class MockDataClient:
     """Client for loading mock data from JSON files"""
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
+        # Parsed mock files by name; the files are static for the process lifetime
+        self._parsed: Dict[str, Dict[str, Any]] = {}
     
-    def load_mock_weather(self, file_path: str = "mock_weather_data.json") -> WeatherData:
-        try:
+    def _read_json(self, file_path: str) -> Dict[str, Any]:
+        data = self._parsed.get(file_path)
+        if data is None:
             with open(self.data_dir / file_path, 'r') as f:
                 data = json.load(f)
+            self._parsed[file_path] = data
+        return data
+    
+    async def preload(self, file_paths: List[str]):
+        """
+        Read and parse mock files on worker threads so later loads are cache hits.
+        Missing or invalid files are skipped here and reported when loaded.
+        """
+        await asyncio.gather(
+            *(asyncio.to_thread(self._read_json, file_path) for file_path in file_paths if file_path not in self._parsed),
+            return_exceptions=True
+        )
+    
+    def load_mock_weather(self, file_path: str = "mock_weather_data.json") -> WeatherData:
+        try:
+            data = self._read_json(file_path)
             return WeatherData(**data)
         except FileNotFoundError:
             raise APIError(api_name="mock_data", error_message=f"Mock weather file not found: {file_path}")
@@ -1061,12 +1265,12 @@ class MockDataClient:
 
     def load_mock_grid(self, file_path: str = "mock_grid_data.json") -> GridData:
         try:
-            with open(self.data_dir / file_path, 'r') as f:
-                data = json.load(f)
+            data = self._read_json(file_path)
             
+            timestamp = data.get("timestamp_utc")
             return GridData(
                 balancing_authority=data.get("balancing_authority", "ERCOT"),
-                timestamp_utc=datetime.fromisoformat(data.get("timestamp_utc", datetime.utcnow().isoformat())),
+                timestamp_utc=datetime.fromisoformat(timestamp) if timestamp else datetime.utcnow(),
                 frequency_hz=data.get("frequency_hz", 60.0),
                 current_demand_mw=data.get("current_demand_mw", 50000),
                 status=data.get("status", "Normal operation"),
@@ -1078,3 +1282,14 @@ class MockDataClient:
                 api_name="mock_grid",
                 error_message=f"Failed to load mock grid data: {str(e)}"
             )
+
+
+def get_mock_client(data_dir: str = "data") -> MockDataClient:
+    """Return the shared MockDataClient for a data directory, so its parse cache is shared too"""
+    # Cached on the plain positional value so every call style maps to one instance
+    return _mock_client_for(data_dir)
+
+
+@functools.lru_cache(maxsize=None)
+def _mock_client_for(data_dir: str) -> MockDataClient:
+    return MockDataClient(data_dir=data_dir)
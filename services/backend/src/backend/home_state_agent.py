@@ -808,7 +808,7 @@ Generate actions now:
         threat_types = threat_analysis.threat_types
         
         print(f"🔄 Generating fallback action for threat level: {threat_level}")
-        print(f"   Threat types: {[t.value for t in threat_types]}")
+        print(f"   Threat types: {threat_types}")
         
         # Default fallback: Battery backup based on threat level
         if threat_level in [ThreatLevel.HIGH, ThreatLevel.CRITICAL]:
@@ -895,7 +895,7 @@ Generate actions now:
         context_parts = []
         
         context_parts.append(f"Overall Threat Level: {threat_analysis.overall_threat_level}")
-        context_parts.append(f"Threat Types: {[t.value for t in threat_analysis.threat_types]}")
+        context_parts.append(f"Threat Types: {threat_analysis.threat_types}")
         context_parts.append(f"Confidence Score: {threat_analysis.confidence_score:.2f}")
         context_parts.append(f"Risk Score: {threat_analysis.risk_score:.2f}")
         
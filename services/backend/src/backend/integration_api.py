@@ -169,9 +169,10 @@ async def emergency_preparation():
             )
         ]
         
+        now = datetime.utcnow()
         request = HomeStateRequest(
             actions=emergency_actions,
-            request_id=f"emergency_prep_{int(datetime.utcnow().timestamp())}"
+            request_id=f"emergency_prep_{int(now.timestamp())}"
         )
         
         result = await orchestrator.home_agent.process_request(request)
@@ -181,7 +182,7 @@ async def emergency_preparation():
             "message": "Emergency preparation completed",
             "home_state": result.home_state,
             "actions_executed": len(emergency_actions),
-            "timestamp": datetime.utcnow()
+            "timestamp": now
         }
         
     except Exception as e:
@@ -1,7 +1,12 @@
 import os
 import time
 import asyncio
-from typing import Dict, List, Optional, Any
+import logging
+import logging.handlers
+import queue
+from bisect import bisect_left
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from langchain_openai import ChatOpenAI
@@ -14,7 +19,8 @@ try:
         APIError, MockDataConfig
     )
     from .api_clients import (
-        OpenWeatherMapClient, EIAClient, PerplexityMCPClient, MockDataClient
+        OpenWeatherMapClient, EIAClient, PerplexityMCPClient, get_mock_client,
+        AsyncClientPool
     )
 except ImportError:
     from threat_models import (
@@ -23,10 +29,191 @@ except ImportError:
         APIError, MockDataConfig
     )
     from api_clients import (
-        OpenWeatherMapClient, EIAClient, PerplexityMCPClient, MockDataClient
+        OpenWeatherMapClient, EIAClient, PerplexityMCPClient, get_mock_client,
+        AsyncClientPool
     )
 
 
+# Static prompt scaffolding for LLM synthesis. Kept byte-identical across calls
+# so that provider-side prompt caching can reuse the prefix.
+_SYSTEM_PROMPT = """You are a threat assessment oracle for smart home energy management systems in Austin, TX.
+
+IMPORTANT: Only identify threats when data clearly exceeds these thresholds:
+- HEAT_WAVE: Temperature > 95°F (not 71°F!)
+- GRID_STRAIN: Demand > 75,000 MW for moderate, > 80,000 MW for high
+- POWER_OUTAGE: Only when grid demand > 85,000 MW (near ERCOT's peak)
+- ENERGY_SHORTAGE: Only when multiple critical indicators are present
+
+For Austin, TX in September, 71°F is NORMAL COOL WEATHER, not a heat wave.
+For ERCOT, 72,962 MW is NORMAL DEMAND, not grid strain.
+
+Be conservative and only identify genuine threats. Most conditions should result in "low" threat level.
+
+Analyze the provided data and return a structured threat assessment with:
+1. Overall threat level (low, moderate, high, critical)
+2. Specific threat types identified (ONLY if thresholds are exceeded)
+3. Primary concerns
+4. Recommended actions
+5. Confidence score (0.0 to 1.0)
+6. Individual threat indicators with severity levels
+
+Focus on threats that could impact:
+- Home cooling/heating systems
+- Battery backup systems
+- Solar panel efficiency
+- Grid connectivity and power availability
+- Energy costs and trading opportunities
+
+Be specific, actionable, and prioritize based on potential impact and urgency."""
+
+_EXAMPLE_JSON = """{
+    "overall_threat_level": "low|moderate|high|critical",
+    "threat_types": ["heat_wave", "grid_strain", "power_outage", "energy_shortage", "combined"],
+    "primary_concerns": ["list of main concerns"],
+    "recommended_actions": ["list of specific actions"],
+    "confidence_score": 0.85,
+    "analysis_summary": "Brief summary incorporating real-time intelligence",
+    "indicators": [
+        {
+            "indicator_type": "temperature",
+            "value": 102.5,
+            "threshold": 95.0,
+            "severity": "high",
+            "description": "Temperature exceeds heat wave threshold",
+            "confidence": 0.9
+        }
+    ]
+}"""
+
+_HUMAN_PROMPT_SUFFIX = "Please provide a comprehensive threat analysis that follows this JSON format:\n" + _EXAMPLE_JSON
+
+logger = logging.getLogger(__name__)
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def start_log_listener():
+    """
+    Route root log records through a queue so handlers (stdout, files) are
+    flushed on a background thread instead of the event loop.
+    Does nothing when the root logger has no handlers, so logging.lastResort
+    keeps reporting warnings and errors in unconfigured processes.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    root = logging.getLogger()
+    if not root.handlers:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _log_listener.start()
+
+
+def stop_log_listener():
+    """Flush and stop the background log listener"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+@dataclass(slots=True, frozen=True)
+class _Indicator:
+    """Lightweight indicator used during rule-based aggregation, converted to ThreatIndicator at the end"""
+    indicator_type: str
+    value: float
+    threshold: float
+    severity: ThreatLevel
+    description: str
+    confidence: float
+
+
+@dataclass(slots=True, frozen=True)
+class _Rule:
+    """One severity band of the rule-based analysis"""
+    threshold: float
+    severity: ThreatLevel
+    label: str
+    confidence: float
+    threat_types: Tuple[ThreatType, ...]
+    concerns: Tuple[str, ...]
+    actions: Tuple[str, ...]
+
+
+# Severity bands in ascending threshold order. A value strictly above a band's
+# threshold (and not above the next) falls into that band; bisect_left on the
+# thresholds gives the band index in one lookup.
+_TEMPERATURE_RULES = (
+    _Rule(95.0, ThreatLevel.MODERATE, "Warm temperature", 0.75, (ThreatType.HEAT_WAVE,),
+          ("Elevated temperatures may increase cooling demand",),
+          ("Monitor cooling systems",)),
+    _Rule(100.0, ThreatLevel.HIGH, "High temperature", 0.85, (ThreatType.HEAT_WAVE,),
+          ("High temperatures increase cooling demand",),
+          ("Optimize thermostat settings",)),
+    _Rule(105.0, ThreatLevel.CRITICAL, "Extreme heat", 0.95, (ThreatType.HEAT_WAVE,),
+          ("Extreme heat poses health and energy risks",),
+          ("Pre-cool home to 68°F", "Charge battery to 100%")),
+)
+
+# ERCOT's historical peak is ~85,000 MW
+_GRID_DEMAND_RULES = (
+    _Rule(75000.0, ThreatLevel.MODERATE, "Elevated grid demand", 0.7, (ThreatType.GRID_STRAIN,),
+          ("Elevated grid demand - monitor for strain",),
+          ("Monitor grid stability",)),
+    _Rule(80000.0, ThreatLevel.HIGH, "High grid demand", 0.8, (ThreatType.GRID_STRAIN,),
+          ("High grid demand may cause strain",),
+          ("Prepare for potential grid issues", "Consider energy trading opportunities")),
+    _Rule(85000.0, ThreatLevel.CRITICAL, "Critical grid demand", 0.9, (ThreatType.GRID_STRAIN, ThreatType.POWER_OUTAGE),
+          ("Critical grid demand - emergency conservation needed",),
+          ("Maximize battery backup", "Prepare for potential outages")),
+)
+
+_TEMPERATURE_THRESHOLDS = [rule.threshold for rule in _TEMPERATURE_RULES]
+_GRID_DEMAND_THRESHOLDS = [rule.threshold for rule in _GRID_DEMAND_RULES]
+
+
+def _match_rule(rules: Tuple[_Rule, ...], thresholds: List[float], value: float) -> Optional[_Rule]:
+    """Return the highest band whose threshold ``value`` exceeds, if any"""
+    index = bisect_left(thresholds, value)
+    return rules[index - 1] if index else None
+
+
+class AsyncRateLimiter:
+    """
+    Token-bucket rate limiter for outbound API calls.
+    Allows at most ``max_rate`` acquisitions per ``time_period`` seconds.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available, then consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._last_refill) * self.max_rate / self.time_period
+                self._tokens = min(float(self.max_rate), self._tokens + refill)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
 class ThreatAssessmentAgent:
     """
     The Threat Assessment Agent (The Oracle) - Agent 1 in the AURA system.
@@ -51,9 +238,9 @@ class ThreatAssessmentAgent:
             api_key=openai_api_key
         ) if openai_api_key else None
         
-        # Initialize API clients
-        self.weather_client = OpenWeatherMapClient()
-        self.grid_client = EIAClient()
+        # Initialize API clients, pooled per region so sessions are reused across requests
+        self._weather_pool = AsyncClientPool(OpenWeatherMapClient, ttl=300)
+        self._grid_pool = AsyncClientPool(EIAClient, ttl=300)
         
         # Only initialize Perplexity MCP client if both API keys are available
         perplexity_key = os.getenv("PERPLEXITY_API_KEY")
@@ -71,19 +258,84 @@ class ThreatAssessmentAgent:
             if not anthropic_key:
                 print("⚠️ ANTHROPIC_API_KEY not found - research capabilities disabled")
         
-        self.mock_client = MockDataClient()
+        self.mock_client = get_mock_client()
         
         # Initialize data source status
         self.data_source_status = DataSourceStatus()
+        
+        # Cap concurrent outbound calls per upstream and stay within provider quotas
+        self._llm_sem = asyncio.Semaphore(8)
+        self._wx_sem = asyncio.Semaphore(16)
+        self._grid_sem = asyncio.Semaphore(8)
+        self._research_sem = asyncio.Semaphore(4)
+        self._llm_limiter = AsyncRateLimiter(max_rate=500, time_period=60)
+        self._grid_limiter = AsyncRateLimiter(max_rate=50, time_period=60)
+        
+        # In-flight analyses keyed by request shape, shared by concurrent callers
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        
+        # ERCOT demand only updates every few minutes, so keep a warm snapshot
+        # refreshed in the background instead of fetching it per request
+        self._grid_refresh_interval = 180.0
+        self._grid_snapshot: Optional[GridData] = None
+        self._grid_snapshot_at = 0.0
+        self._grid_refresh_task: Optional[asyncio.Task] = None
 
     def update_mock_config(self, mock_config: MockDataConfig):
         """Dynamically update the mock data configuration."""
         self.mock_config = mock_config
         print(f"Threat agent mock config updated: weather={self.mock_config.use_mock_weather}, grid={self.mock_config.use_mock_grid}")
     
+    async def start(self):
+        """Start background refresh of the ERCOT grid snapshot"""
+        if self._grid_refresh_task is None:
+            self._grid_refresh_task = asyncio.create_task(self._refresh_grid_loop())
+    
+    async def _refresh_grid_loop(self):
+        while True:
+            try:
+                await self._fetch_live_grid()
+            except Exception as e:
+                logger.warning("Background grid refresh failed: %s", e)
+            await asyncio.sleep(self._grid_refresh_interval)
+    
+    async def _fetch_live_grid(self) -> GridData:
+        """Fetch ERCOT grid data from the live API and update the snapshot"""
+        async with self._grid_sem, self._grid_limiter:
+            async with self._grid_pool.get("ERCOT") as client:
+                grid_data = await client.get_grid_data("ERCOT")
+        self._grid_snapshot = grid_data
+        self._grid_snapshot_at = time.monotonic()
+        return grid_data
+    
     async def analyze_threats(self, request: ThreatAnalysisRequest) -> ThreatAnalysisResult:
         """
         Main entry point for threat analysis.
+        Concurrent requests for the same location and data sources are coalesced
+        into a single pipeline run whose result is shared by all callers.
+        """
+        key = (request.location, request.include_weather, request.include_grid, request.include_research)
+        
+        # The pipeline runs in its own task that no caller owns, so one caller being
+        # cancelled (e.g. a client disconnect) never cancels the others' analysis
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_analysis(request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._release_inflight(key, done))
+        
+        result = await asyncio.shield(task)
+        if result.request_id != request.request_id:
+            result = result.model_copy(update={"request_id": request.request_id})
+        return result
+    
+    def _release_inflight(self, key: tuple, task: asyncio.Task):
+        """Forget a finished analysis so the next request for the same key starts fresh"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    async def _run_analysis(self, request: ThreatAnalysisRequest) -> ThreatAnalysisResult:
+        """
         Executes the complete data-fusion pipeline.
         """
         start_time = time.time()
@@ -91,64 +343,35 @@ class ThreatAssessmentAgent:
         errors = []
         
         try:
-            # Step 1: Gather data from all sources
-            weather_data = None
-            grid_data = None
-            research_data = None
-            
-            # Gather weather data - prioritize real APIs, fallback to mock only if real API fails
-            if request.include_weather:
-                try:
-                    # Always try real API first
-                    async with self.weather_client as client:
-                        weather_data = await client.get_current_weather(request.location)
-                    raw_data["weather"] = weather_data.dict()
-                    print(f"✅ Real weather data retrieved for {request.location}")
-                except Exception as e:
-                    print(f"⚠️ Real weather API failed: {e}")
-                    # Fallback to mock data only if real API fails
-                    try:
-                        weather_data = self.mock_client.load_mock_weather(self.mock_config.mock_weather_file)
-                        raw_data["weather"] = weather_data.dict()
-                        print(f"📊 Using mock weather data as fallback")
-                    except Exception as mock_e:
-                        print(f"❌ Mock weather data also failed: {mock_e}")
-                        error = APIError(api_name="weather", error_message=f"Real API: {str(e)}, Mock: {str(mock_e)}")
-                        errors.append(error)
-                        self.data_source_status.weather_api = False
-            
-            # Gather grid data - prioritize real APIs, fallback to mock only if real API fails
-            if request.include_grid:
-                try:
-                    # Always try real API first
-                    async with self.grid_client as client:
-                        grid_data = await self.grid_client.get_grid_data("ERCOT")
-                    raw_data["grid"] = grid_data.dict()
-                    print(f"✅ Real grid data retrieved for ERCOT")
-                except Exception as e:
-                    print(f"⚠️ Real grid API failed: {e}")
-                    # Fallback to mock data only if real API fails
-                    try:
-                        grid_data = self.mock_client.load_mock_grid(self.mock_config.mock_grid_file)
-                        raw_data["grid"] = grid_data.dict()
-                        print(f"📊 Using mock grid data as fallback")
-                    except Exception as mock_e:
-                        print(f"❌ Mock grid data also failed: {mock_e}")
-                        error = APIError(api_name="grid", error_message=f"Real API: {str(e)}, Mock: {str(mock_e)}")
-                        errors.append(error)
-                        self.data_source_status.grid_api = False
+            # Step 1: Gather data from all sources concurrently. Research starts as soon as
+            # weather or grid actually returns data; if neither does, it runs once both finish.
+            wx_task = asyncio.create_task(self._fetch_weather(request))
+            gr_task = asyncio.create_task(self._fetch_grid(request))
+            try:
+                research = (None, None, None)
+                if request.include_research and self.llm and self.research_client:
+                    pending = {wx_task, gr_task}
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        if any(task.result()[0] is not None for task in done):
+                            break
+                    context = self._build_research_context(
+                        wx_task.result()[0] if wx_task.done() else None,
+                        gr_task.result()[0] if gr_task.done() else None
+                    )
+                    research = await self._fetch_research(request, context)
+                weather, grid = await asyncio.gather(wx_task, gr_task)
+            finally:
+                wx_task.cancel()
+                gr_task.cancel()
             
-            # Gather research data
-            if request.include_research and self.llm and self.research_client:
-                try:
-                    context = self._build_research_context(weather_data, grid_data)
-                    async with self.research_client as client:
-                        research_data = await client.research_threats(request.location, context)
-                    raw_data["research"] = research_data
-                except Exception as e:
-                    error = APIError(api_name="research", error_message=str(e))
+            # Merge each source's raw payload and error once every fetch has finished
+            for name, (_, raw, error) in (("weather", weather), ("grid", grid), ("research", research)):
+                if raw is not None:
+                    raw_data[name] = raw
+                if error is not None:
                     errors.append(error)
-                    self.data_source_status.research_api = False
+            weather_data, grid_data, research_data = weather[0], grid[0], research[0]
             
             # Step 2: Synthesize data using LLM
             analysis = await self._synthesize_threat_analysis(
@@ -177,6 +400,86 @@ class ThreatAssessmentAgent:
                 processing_time_ms=processing_time
             )
     
+    async def _fetch_weather(
+        self, request: ThreatAnalysisRequest
+    ) -> Tuple[Optional[WeatherData], Optional[Dict[str, Any]], Optional[APIError]]:
+        """
+        Gather weather data - prioritize real APIs, fallback to mock only if real API fails.
+        Returns (data, raw payload, error) for the caller to merge.
+        """
+        if not request.include_weather:
+            return None, None, None
+        try:
+            # Always try real API first
+            async with self._wx_sem:
+                async with self._weather_pool.get(request.location) as client:
+                    weather_data, raw = await client.get_current_weather_raw(request.location)
+            print(f"✅ Real weather data retrieved for {request.location}")
+            return weather_data, raw, None
+        except Exception as e:
+            logger.warning("Real weather API failed: %s", e)
+            # Fallback to mock data only if real API fails
+            try:
+                weather_data = await asyncio.to_thread(self.mock_client.load_mock_weather, self.mock_config.mock_weather_file)
+                print(f"📊 Using mock weather data as fallback")
+                return weather_data, weather_data.dict(), None
+            except Exception as mock_e:
+                logger.error("Mock weather data also failed: %s", mock_e)
+                error = APIError(api_name="weather", error_message=f"Real API: {str(e)}, Mock: {str(mock_e)}")
+                self.data_source_status.weather_api = False
+                return None, None, error
+    
+    async def _fetch_grid(
+        self, request: ThreatAnalysisRequest
+    ) -> Tuple[Optional[GridData], Optional[Dict[str, Any]], Optional[APIError]]:
+        """
+        Gather grid data - prioritize real APIs, fallback to mock only if real API fails.
+        Returns (data, raw payload, error) for the caller to merge.
+        """
+        if not request.include_grid:
+            return None, None, None
+        # Serve the background snapshot while the refresh loop keeps it fresh; without
+        # start() a snapshot is just the last one-shot fetch, so fetch live instead
+        snapshot = self._grid_snapshot
+        refreshing = self._grid_refresh_task is not None and not self._grid_refresh_task.done()
+        if (
+            refreshing
+            and snapshot is not None
+            and time.monotonic() - self._grid_snapshot_at < 2 * self._grid_refresh_interval
+        ):
+            return snapshot, snapshot.dict(), None
+        try:
+            # Always try real API first
+            grid_data = await self._fetch_live_grid()
+            print(f"✅ Real grid data retrieved for ERCOT")
+            return grid_data, grid_data.dict(), None
+        except Exception as e:
+            logger.warning("Real grid API failed: %s", e)
+            # Fallback to mock data only if real API fails
+            try:
+                grid_data = await asyncio.to_thread(self.mock_client.load_mock_grid, self.mock_config.mock_grid_file)
+                print(f"📊 Using mock grid data as fallback")
+                return grid_data, grid_data.dict(), None
+            except Exception as mock_e:
+                logger.error("Mock grid data also failed: %s", mock_e)
+                error = APIError(api_name="grid", error_message=f"Real API: {str(e)}, Mock: {str(mock_e)}")
+                self.data_source_status.grid_api = False
+                return None, None, error
+    
+    async def _fetch_research(
+        self, request: ThreatAnalysisRequest, context: str
+    ) -> Tuple[Optional[str], Optional[str], Optional[APIError]]:
+        """Gather research data. Returns (data, raw payload, error) for the caller to merge."""
+        try:
+            async with self._research_sem:
+                async with self.research_client as client:
+                    research_data = await client.research_threats(request.location, context)
+            return research_data, research_data, None
+        except Exception as e:
+            error = APIError(api_name="research", error_message=str(e))
+            self.data_source_status.research_api = False
+            return None, None, error
+    
     async def _synthesize_threat_analysis(
         self, 
         weather_data: Optional[WeatherData], 
@@ -191,64 +494,6 @@ class ThreatAssessmentAgent:
             # Fallback to rule-based analysis if no LLM
             return self._rule_based_analysis(weather_data, grid_data, location)
         
-        # Build context for LLM
-        context = self._build_analysis_context(weather_data, grid_data, research_data, location)
-        
-        # Create system prompt for threat analysis
-        system_prompt = """You are a threat assessment oracle for smart home energy management systems in Austin, TX.
-
-IMPORTANT: Only identify threats when data clearly exceeds these thresholds:
-- HEAT_WAVE: Temperature > 95°F (not 71°F!)
-- GRID_STRAIN: Demand > 75,000 MW for moderate, > 80,000 MW for high
-- POWER_OUTAGE: Only when grid demand > 85,000 MW (near ERCOT's peak)
-- ENERGY_SHORTAGE: Only when multiple critical indicators are present
-
-For Austin, TX in September, 71°F is NORMAL COOL WEATHER, not a heat wave.
-For ERCOT, 72,962 MW is NORMAL DEMAND, not grid strain.
-
-Be conservative and only identify genuine threats. Most conditions should result in "low" threat level.
-
-Analyze the provided data and return a structured threat assessment with:
-1. Overall threat level (low, moderate, high, critical)
-2. Specific threat types identified (ONLY if thresholds are exceeded)
-3. Primary concerns
-4. Recommended actions
-5. Confidence score (0.0 to 1.0)
-6. Individual threat indicators with severity levels
-
-Focus on threats that could impact:
-- Home cooling/heating systems
-- Battery backup systems
-- Solar panel efficiency
-- Grid connectivity and power availability
-- Energy costs and trading opportunities
-
-Be specific, actionable, and prioritize based on potential impact and urgency."""
-
-        human_prompt = f"""Location: {location}
-
-{context}
-
-Please provide a comprehensive threat analysis that follows this JSON format, noting this is an example output:
-{{
-    "overall_threat_level": "low|moderate|high|critical",
-    "threat_types": ["heat_wave", "grid_strain", "power_outage", "energy_shortage", "combined"],
-    "primary_concerns": ["list of main concerns"],
-    "recommended_actions": ["list of specific actions"],
-    "confidence_score": 0.85,
-    "analysis_summary": "Brief summary of the analysis",
-    "indicators": [
-        {{
-            "indicator_type": "temperature",
-            "value": 102.5,
-            "threshold": 95.0,
-            "severity": "high",
-            "description": "Temperature exceeds heat wave threshold",
-            "confidence": 0.9
-        }}
-    ]
-}}"""
-
         try:
             # Enhanced synthesis using both LangChain LLM and Perplexity MCP research
             
@@ -262,11 +507,12 @@ Please provide a comprehensive threat analysis that follows this JSON format, no
                 # Gather fresh threat intelligence using MCP client
                 try:
                     context = self._build_research_context(weather_data, grid_data)
-                    async with self.research_client as client:
-                        research_intelligence = await client.research_threats(location, context)
+                    async with self._research_sem:
+                        async with self.research_client as client:
+                            research_intelligence = await client.research_threats(location, context)
                     print(f"🔍 Perplexity MCP research results: {research_intelligence[:500]}...")
                 except Exception as e:
-                    print(f"⚠️ Failed to gather threat intelligence: {e}")
+                    logger.warning("Failed to gather threat intelligence: %s", e)
                     research_intelligence = "No real-time threat intelligence available"
             
             # Step 2: Enhanced context with real-time intelligence
@@ -275,33 +521,12 @@ Please provide a comprehensive threat analysis that follows this JSON format, no
             
             # Step 3: Use LangChain LLM for structured analysis
             messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"""Location: {location}
-
-{enhanced_context}
-
-Please provide a comprehensive threat analysis that follows this JSON format:
-{{
-    "overall_threat_level": "low|moderate|high|critical",
-    "threat_types": ["heat_wave", "grid_strain", "power_outage", "energy_shortage", "combined"],
-    "primary_concerns": ["list of main concerns"],
-    "recommended_actions": ["list of specific actions"],
-    "confidence_score": 0.85,
-    "analysis_summary": "Brief summary incorporating real-time intelligence",
-    "indicators": [
-        {{
-            "indicator_type": "temperature",
-            "value": 102.5,
-            "threshold": 95.0,
-            "severity": "high",
-            "description": "Temperature exceeds heat wave threshold",
-            "confidence": 0.9
-        }}
-    ]
-}}""")
+                SystemMessage(content=_SYSTEM_PROMPT),
+                HumanMessage(content=f"Location: {location}\n\n{enhanced_context}\n\n{_HUMAN_PROMPT_SUFFIX}")
             ]
             
-            response = await self.llm.ainvoke(messages)
+            async with self._llm_sem, self._llm_limiter:
+                response = await self.llm.ainvoke(messages)
             
             # Parse LLM response into structured analysis
             analysis_dict = self._parse_llm_response(response.content)
@@ -314,8 +539,8 @@ Please provide a comprehensive threat analysis that follows this JSON format:
             
             return ThreatAnalysis(**analysis_dict)
             
-        except Exception as e:
-            print(f"Enhanced LLM synthesis failed: {e}")
+        except Exception:
+            logger.exception("Enhanced LLM synthesis failed")
             # Fallback to rule-based analysis
             return self._rule_based_analysis(weather_data, grid_data, location)
     
@@ -333,90 +558,30 @@ Please provide a comprehensive threat analysis that follows this JSON format:
         primary_concerns = []
         recommended_actions = []
         
+        def apply(rule: Optional[_Rule], indicator_type: str, value: float, unit: str):
+            if rule is None:
+                return
+            indicators.append(_Indicator(
+                indicator_type=indicator_type,
+                value=value,
+                threshold=rule.threshold,
+                severity=rule.severity,
+                description=f"{rule.label}: {value}{unit}",
+                confidence=rule.confidence
+            ))
+            threat_types.extend(rule.threat_types)
+            primary_concerns.extend(rule.concerns)
+            recommended_actions.extend(rule.actions)
+        
         # Analyze weather data - use more realistic thresholds
         if weather_data:
             temp = weather_data.temperature_f
-            if temp > 105:
-                indicators.append(ThreatIndicator(
-                    indicator_type="temperature",
-                    value=temp,
-                    threshold=105.0,
-                    severity=ThreatLevel.CRITICAL,
-                    description=f"Extreme heat: {temp}°F",
-                    confidence=0.95
-                ))
-                threat_types.append(ThreatType.HEAT_WAVE)
-                primary_concerns.append("Extreme heat poses health and energy risks")
-                recommended_actions.append("Pre-cool home to 68°F")
-                recommended_actions.append("Charge battery to 100%")
-            elif temp > 100:
-                indicators.append(ThreatIndicator(
-                    indicator_type="temperature",
-                    value=temp,
-                    threshold=100.0,
-                    severity=ThreatLevel.HIGH,
-                    description=f"High temperature: {temp}°F",
-                    confidence=0.85
-                ))
-                threat_types.append(ThreatType.HEAT_WAVE)
-                primary_concerns.append("High temperatures increase cooling demand")
-                recommended_actions.append("Optimize thermostat settings")
-            elif temp > 95:
-                indicators.append(ThreatIndicator(
-                    indicator_type="temperature",
-                    value=temp,
-                    threshold=95.0,
-                    severity=ThreatLevel.MODERATE,
-                    description=f"Warm temperature: {temp}°F",
-                    confidence=0.75
-                ))
-                # Only add heat wave threat for moderate+ temperatures (95°F+)
-                threat_types.append(ThreatType.HEAT_WAVE)
-                primary_concerns.append("Elevated temperatures may increase cooling demand")
-                recommended_actions.append("Monitor cooling systems")
+            apply(_match_rule(_TEMPERATURE_RULES, _TEMPERATURE_THRESHOLDS, temp), "temperature", temp, "°F")
         
         # Analyze grid data - use more realistic thresholds for ERCOT
         if grid_data:
             demand = grid_data.current_demand_mw
-            if demand > 85000:  # Near ERCOT's historical peak of ~85,000 MW
-                indicators.append(ThreatIndicator(
-                    indicator_type="grid_demand",
-                    value=demand,
-                    threshold=85000,
-                    severity=ThreatLevel.CRITICAL,
-                    description=f"Critical grid demand: {demand} MW",
-                    confidence=0.9
-                ))
-                threat_types.append(ThreatType.GRID_STRAIN)
-                threat_types.append(ThreatType.POWER_OUTAGE)  # High risk of outages at peak demand
-                primary_concerns.append("Critical grid demand - emergency conservation needed")
-                recommended_actions.append("Maximize battery backup")
-                recommended_actions.append("Prepare for potential outages")
-            elif demand > 80000:  # High demand threshold
-                indicators.append(ThreatIndicator(
-                    indicator_type="grid_demand",
-                    value=demand,
-                    threshold=80000,
-                    severity=ThreatLevel.HIGH,
-                    description=f"High grid demand: {demand} MW",
-                    confidence=0.8
-                ))
-                threat_types.append(ThreatType.GRID_STRAIN)
-                primary_concerns.append("High grid demand may cause strain")
-                recommended_actions.append("Prepare for potential grid issues")
-                recommended_actions.append("Consider energy trading opportunities")
-            elif demand > 75000:  # Moderate demand threshold
-                indicators.append(ThreatIndicator(
-                    indicator_type="grid_demand",
-                    value=demand,
-                    threshold=75000,
-                    severity=ThreatLevel.MODERATE,
-                    description=f"Elevated grid demand: {demand} MW",
-                    confidence=0.7
-                ))
-                threat_types.append(ThreatType.GRID_STRAIN)
-                primary_concerns.append("Elevated grid demand - monitor for strain")
-                recommended_actions.append("Monitor grid stability")
+            apply(_match_rule(_GRID_DEMAND_RULES, _GRID_DEMAND_THRESHOLDS, demand), "grid_demand", demand, " MW")
         
         # Determine overall threat level
         if any(ind.severity == ThreatLevel.CRITICAL for ind in indicators):
@@ -449,13 +614,16 @@ Please provide a comprehensive threat analysis that follows this JSON format:
             analysis_summary = "No significant threats identified"
         
         return ThreatAnalysis(
-            overall_threat_level=overall_threat_level,
-            threat_types=threat_types,
+            overall_threat_level=overall_threat_level.value,
+            threat_types=[t.value for t in threat_types],
             primary_concerns=primary_concerns,
             recommended_actions=recommended_actions,
             confidence_score=0.7,
             analysis_summary=analysis_summary,
-            indicators=indicators
+            indicators=[
+                ThreatIndicator.model_construct(**{**asdict(ind), "severity": ind.severity.value})
+                for ind in indicators
+            ]
         )
     
     def _build_research_context(
@@ -532,8 +700,8 @@ Research Data:
                 
                 # Validate and clean the parsed data
                 return self._validate_and_clean_analysis(parsed_data)
-        except Exception as e:
-            print(f"JSON parsing failed: {e}")
+        except Exception:
+            logger.exception("JSON parsing failed")
         
         # Fallback: return basic structure
         return {
@@ -636,3 +804,15 @@ Research Data:
     def update_mock_config(self, config: MockDataConfig):
         """Update mock data configuration"""
         self.mock_config = config
+    
+    async def close(self):
+        """Stop background refresh and close pooled API client sessions"""
+        if self._grid_refresh_task is not None:
+            self._grid_refresh_task.cancel()
+            try:
+                await self._grid_refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._grid_refresh_task = None
+        await self._weather_pool.close()
+        await self._grid_pool.close()
@@ -3,7 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
 
-from .threat_assessment_agent import ThreatAssessmentAgent
+from .threat_assessment_agent import ThreatAssessmentAgent, start_log_listener, stop_log_listener
 from .threat_models import (
     ThreatAnalysisRequest, ThreatAnalysisResult, MockDataConfig, DataSourceStatus
 )
@@ -38,9 +38,18 @@ router = APIRouter(prefix="/threat-assessment", tags=["Threat Assessment Agent"]
 @router.on_event("startup")
 async def startup_threat_assessment_agent():
     """Initialize the Threat Assessment Agent on startup"""
+    start_log_listener()
     initialize_threat_assessment_agent()
+    await threat_assessment_agent.start()
     print("✅ Threat Assessment Agent (The Oracle) initialized")
 
+@router.on_event("shutdown")
+async def shutdown_threat_assessment_agent():
+    """Release pooled API client sessions on shutdown"""
+    if threat_assessment_agent:
+        await threat_assessment_agent.close()
+    stop_log_listener()
+
 @router.post("/analyze", response_model=ThreatAnalysisResult)
 async def analyze_threats(request: ThreatAnalysisRequest):
     """
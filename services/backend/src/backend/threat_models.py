@@ -23,6 +23,16 @@ class ThreatType(str, Enum):
     AIR_QUALITY = "air_quality"
 
 
+# Field annotations for the enums above: Literal strings validate and serialize
+# in pydantic-core without Python-side enum coercion. ThreatLevel/ThreatType
+# members still compare equal to these values.
+ThreatLevelLiteral = Literal["low", "moderate", "high", "critical"]
+ThreatTypeLiteral = Literal[
+    "heat_wave", "grid_strain", "power_outage", "energy_shortage",
+    "combined", "wildfire_risk", "air_quality"
+]
+
+
 class WeatherData(BaseModel):
     """Weather data from OpenWeatherMap API"""
     location: str
@@ -51,15 +61,15 @@ class ThreatIndicator(BaseModel):
     indicator_type: str
     value: float
     threshold: float
-    severity: ThreatLevel
+    severity: ThreatLevelLiteral
     description: str
     confidence: float = Field(ge=0.0, le=1.0)
 
 
 class ThreatAnalysis(BaseModel):
     """Synthesized threat analysis"""
-    overall_threat_level: ThreatLevel
-    threat_types: List[ThreatType]
+    overall_threat_level: ThreatLevelLiteral
+    threat_types: List[ThreatTypeLiteral]
     primary_concerns: List[str]
     recommended_actions: List[str]
     confidence_score: float = Field(ge=0.0, le=1.0)
@@ -1,38 +1,46 @@
+import asyncio
+import functools
+import logging
 import os
+import random
+import re
 import time
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from .models import SmartHomeAlert, HomeStatus
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
-class AURAVoiceService:
-    def __init__(self):
-        self.api_key = os.getenv("VAPI_API_KEY")
-        if not self.api_key:
-            print("⚠️ VAPI API key not configured - voice calls will be simulated")
-            self.simulate_mode = True
-        else:
-            print("✅ VAPI configured - real voice calls enabled")
-            self.simulate_mode = False
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
 
-    async def send_warning_call(self, alert: SmartHomeAlert, phone_number: str) -> Dict[str, Any]:
-        """Send the initial warning call to homeowner"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
-        
-        # Create the warning message
-        warning_message = f"This is AURA. {alert.message}"
-        
-        # Create assistant context for the warning call
-        assistant_context = f"""
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+
+_E164_RE = re.compile(r'^\+[1-9]\d{1,14}$')
+_DIGITS_RE = re.compile(r'\D+')
+# Deletes every Latin-1 non-digit; covers formatted numbers like "+1 (512) 555-0100"
+_NON_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not '0' <= chr(c) <= '9'))
+
+# Static prompt scaffolding around the per-call alert/report text
+_WARNING_CTX_PREFIX = """
 You are AURA, an AI smart home management system. You are calling a homeowner about a potential weather event.
 
-URGENT ALERT: {alert.message}
+URGENT ALERT: """
+_WARNING_CTX_SUFFIX = """
 
 INSTRUCTIONS:
 1. Clearly communicate the urgent alert message above
@@ -45,94 +53,19 @@ INSTRUCTIONS:
 Remember: You are a helpful AI assistant managing their smart home. Be reassuring but urgent about the situation.
 """
 
-        if self.simulate_mode:
-            # Simulate the call for demo purposes
-            print(f"📞 [SIMULATED] Warning call to {phone_number}")
-            print(f"   Message: {warning_message}")
-            return {
-                "success": True,
-                "call_id": f"sim_{int(time.time())}",
-                "message": "Warning call simulated successfully"
-            }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                call_payload = {
-                    "phoneNumberId": os.getenv("VAPI_PHONE_NUMBER_ID"),
-                    "customer": {"number": phone_number},
-                    "assistant": {
-                        "firstMessage": warning_message,
-                        "model": {
-                            "provider": "xai",
-                            "model": "grok-3",
-                            "temperature": 0.1,
-                            "messages": [
-                                {"role": "system", "content": assistant_context},
-                                {
-                                    "role": "user",
-                                    "content": warning_message,
-                                },
-                            ],
-                        },
-                        "voice": {"provider": "11labs", "voiceId": "burt"},
-                    },
-                }
-
-                response = await client.post(
-                    "https://api.vapi.ai/call",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=call_payload,
-                )
-
-                if response.status_code == 201:
-                    call_data = response.json()
-                    return {
-                        "success": True,
-                        "call_id": call_data.get("id"),
-                        "message": "Warning call initiated successfully"
-                    }
-                else:
-                    print(f"Failed to initiate warning call: {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code}"
-                    }
-
-            except Exception as e:
-                print(f"Failed to send warning call: {e}")
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
-
-    async def send_resolution_call(self, phone_number: str, home_status: HomeStatus) -> Dict[str, Any]:
-        """Send the final resolution call with results"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
-        
-        # Create the resolution message
-        resolution_message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${home_status.profit_generated:.2f}. The situation is managed."
-        
-        # Create assistant context for the resolution call
-        assistant_context = f"""
+_RESOLUTION_CTX_PREFIX = """
 You are AURA, an AI smart home management system. You are calling a homeowner with a final report after successfully managing a weather event.
 
-FINAL REPORT: {resolution_message}
+FINAL REPORT: """
+_RESOLUTION_CTX_MIDDLE = """
 
 INSTRUCTIONS:
 1. Clearly communicate the final report message above
 2. Provide a brief summary of what was accomplished:
    - Home is now secure and operating on battery power
    - Energy sale was successful
-   - Profit generated: ${home_status.profit_generated:.2f}
+   - Profit generated: $"""
+_RESOLUTION_CTX_SUFFIX = """
    - Situation is fully managed
 3. Ask if they have any questions about the actions taken
 4. Keep the conversation brief and professional
@@ -141,65 +74,225 @@ INSTRUCTIONS:
 Remember: You are providing a positive update about successful home protection. Be confident and reassuring.
 """
 
+# Fixed parts of the VAPI call payload; shared read-only across calls
+_VAPI_CALL_URL = "https://api.vapi.ai/call"
+_MODEL_CONFIG = {"provider": "xai", "model": "grok-3", "temperature": 0.1}
+_VOICE_CONFIG = {"provider": "11labs", "voiceId": "burt"}
+
+# Call creation is not idempotent, so only failures where VAPI never accepted the
+# request are retried: connect-phase errors, and 429/503 responses carrying Retry-After
+_MAX_CALL_ATTEMPTS = 4
+_MAX_BACKOFF_SECONDS = 16.0
+_RETRY_STATUS_CODES = frozenset({429, 503})
+
+
+def _build_call_payload(
+    phone_number_id: Optional[str], phone_number: str, first_message: str, assistant_context: str
+) -> Dict[str, Any]:
+    """Assemble a VAPI outbound call payload around the static model/voice config"""
+    return {
+        "phoneNumberId": phone_number_id,
+        "customer": {"number": phone_number},
+        "assistant": {
+            "firstMessage": first_message,
+            "model": {
+                **_MODEL_CONFIG,
+                "messages": [
+                    {"role": "system", "content": assistant_context},
+                    {"role": "user", "content": first_message},
+                ],
+            },
+            "voice": _VOICE_CONFIG,
+        },
+    }
+
+
+# Shared VAPI client so consecutive calls reuse a warm connection
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_client(api_key: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Return the shared VAPI HTTP client, creating it on first use.
+    The auth and content-type headers are set once as client defaults.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            timeout=10.0,
+            headers={
+                "Authorization": f"Bearer {api_key or os.getenv('VAPI_API_KEY')}",
+                "Content-Type": "application/json",
+            }
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared VAPI HTTP client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@functools.lru_cache(maxsize=1024)
+def to_e164(number: str) -> str:
+    """
+    Normalize a phone number to E.164, assuming US numbers when no country code is given.
+    Raises ValueError if the result is not a valid E.164 number.
+    """
+    digits = number.translate(_NON_DIGITS)
+    if not (digits.isascii() and digits.isdigit()):
+        # Characters outside Latin-1 survive the table; fall back to the regex
+        digits = _DIGITS_RE.sub('', number)
+    if len(digits) == 10 and not number.startswith('+'):
+        result = '+1' + digits
+    else:
+        result = '+' + digits
+    if not _E164_RE.match(result):
+        raise ValueError(f"Invalid phone number: {number}")
+    return result
+
+
+class AURAVoiceService:
+    def __init__(self):
+        self.api_key = os.getenv("VAPI_API_KEY")
+        self.phone_number_id = os.getenv("VAPI_PHONE_NUMBER_ID")
+        if not self.api_key:
+            logger.warning("VAPI API key not configured - voice calls will be simulated")
+            self.simulate_mode = True
+        else:
+            logger.info("VAPI configured - real voice calls enabled")
+            self.simulate_mode = False
+
+    async def _post_call(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        POST a call to VAPI, retrying only when the call cannot have been placed:
+        connection failures, and 429/503 responses that send a Retry-After header.
+        Read timeouts and other 5xx responses are not retried, since the call may already exist.
+        """
+        client = await get_client(self.api_key)
+        body = _json_dumps(payload)
+        for attempt in range(_MAX_CALL_ATTEMPTS):
+            last_attempt = attempt == _MAX_CALL_ATTEMPTS - 1
+            delay = min(_MAX_BACKOFF_SECONDS, 2 ** attempt) + random.uniform(0, 1)
+            try:
+                response = await client.post(_VAPI_CALL_URL, content=body)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last_attempt:
+                    raise
+            else:
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code not in _RETRY_STATUS_CODES or retry_after is None or last_attempt:
+                    return response
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+
+    async def _send_call(self, phone_number: str, first_message: str, assistant_context: str, call_kind: str) -> Dict[str, Any]:
+        """Normalize the number, then place (or simulate) a VAPI call of the given kind"""
+        
+        # Ensure phone number is in E.164 format
+        try:
+            phone_number = to_e164(phone_number)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
         if self.simulate_mode:
             # Simulate the call for demo purposes
-            print(f"📞 [SIMULATED] Resolution call to {phone_number}")
-            print(f"   Message: {resolution_message}")
+            logger.info("[SIMULATED] %s call to %s: %s", call_kind, phone_number, first_message)
             return {
                 "success": True,
                 "call_id": f"sim_{int(time.time())}",
-                "message": "Resolution call simulated successfully"
+                "message": f"{call_kind} call simulated successfully"
             }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                call_payload = {
-                    "phoneNumberId": os.getenv("VAPI_PHONE_NUMBER_ID"),
-                    "customer": {"number": phone_number},
-                    "assistant": {
-                        "firstMessage": resolution_message,
-                        "model": {
-                            "provider": "xai",
-                            "model": "grok-3",
-                            "temperature": 0.1,
-                            "messages": [
-                                {"role": "system", "content": assistant_context},
-                                {
-                                    "role": "user",
-                                    "content": resolution_message,
-                                },
-                            ],
-                        },
-                        "voice": {"provider": "11labs", "voiceId": "burt"},
-                    },
-                }
+        try:
+            call_payload = _build_call_payload(self.phone_number_id, phone_number, first_message, assistant_context)
 
-                response = await client.post(
-                    "https://api.vapi.ai/call",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=call_payload,
-                )
-
-                if response.status_code == 201:
-                    call_data = response.json()
-                    return {
-                        "success": True,
-                        "call_id": call_data.get("id"),
-                        "message": "Resolution call initiated successfully"
-                    }
-                else:
-                    print(f"Failed to initiate resolution call: {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code}"
-                    }
-
-            except Exception as e:
-                print(f"Failed to send resolution call: {e}")
+            response = await self._post_call(call_payload)
+
+            if response.status_code == 201:
+                call_data = _json_loads(response.content)
+                return {
+                    "success": True,
+                    "call_id": call_data.get("id"),
+                    "message": f"{call_kind} call initiated successfully"
+                }
+            else:
+                # Decoding the body is only worth it when the record will be emitted
+                if logger.isEnabledFor(logging.ERROR):
+                    logger.error("Failed to initiate %s call, VAPI %d: %s", call_kind.lower(), response.status_code, response.text)
                 return {
                     "success": False,
-                    "error": str(e)
-                }
\ No newline at end of file
+                    "error": f"API error: {response.status_code}"
+                }
+
+        except Exception as e:
+            logger.error("Failed to send %s call: %s", call_kind.lower(), e)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def send_warning_call(self, alert: SmartHomeAlert, phone_number: str) -> Dict[str, Any]:
+        """Send the initial warning call to homeowner"""
+        
+        # Create the warning message
+        warning_message = f"This is AURA. {alert.message}"
+        
+        # Create assistant context for the warning call
+        assistant_context = _WARNING_CTX_PREFIX + alert.message + _WARNING_CTX_SUFFIX
+
+        return await self._send_call(phone_number, warning_message, assistant_context, "Warning")
+
+    async def send_warning_calls_bulk(self, alerts_phones: List[Tuple[SmartHomeAlert, str]]) -> List[Dict[str, Any]]:
+        """Send warning calls to several homeowners concurrently, returning results in input order"""
+        results = await asyncio.gather(
+            *(self.send_warning_call(alert, phone_number) for alert, phone_number in alerts_phones),
+            return_exceptions=True
+        )
+        return [
+            {"success": False, "error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    async def send_resolution_call(self, phone_number: str, home_status: HomeStatus) -> Dict[str, Any]:
+        """Send the final resolution call with results"""
+        
+        # Create the resolution message
+        resolution_message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${home_status.profit_generated:.2f}. The situation is managed."
+        
+        # Create assistant context for the resolution call
+        assistant_context = (
+            _RESOLUTION_CTX_PREFIX + resolution_message
+            + _RESOLUTION_CTX_MIDDLE + f"{home_status.profit_generated:.2f}"
+            + _RESOLUTION_CTX_SUFFIX
+        )
+
+        return await self._send_call(phone_number, resolution_message, assistant_context, "Resolution")
+
+    async def send_resolution_calls_bulk(self, phones_statuses: List[Tuple[str, HomeStatus]]) -> List[Dict[str, Any]]:
+        """Send resolution calls to several homeowners concurrently, returning results in input order"""
+        results = await asyncio.gather(
+            *(self.send_resolution_call(phone_number, home_status) for phone_number, home_status in phones_statuses),
+            return_exceptions=True
+        )
+        return [
+            {"success": False, "error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+
+@functools.lru_cache(maxsize=1)
+def get_voice_service() -> AURAVoiceService:
+    """Return the process-wide AURAVoiceService, created on first use"""
+    return AURAVoiceService()
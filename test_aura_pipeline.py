@@ -5,11 +5,12 @@ Tests the integration between Threat Assessment Agent and Home State Agent.
 """
 
 import asyncio
+import functools
 import sys
 import os
-import json
 from pathlib import Path
 from datetime import datetime
+from typing import NamedTuple
 
 # Add the backend directory to Python path
 backend_dir = Path(__file__).parent / "services" / "backend" / "src"
@@ -17,29 +18,44 @@ sys.path.insert(0, str(backend_dir))
 sys.path.insert(0, str(backend_dir / "backend"))
 
 from agent_orchestrator import AgentOrchestrator
-from threat_models import ThreatAnalysisRequest, ThreatLevel, ThreatType
+from threat_models import ThreatAnalysisRequest, ThreatLevel, ThreatType, MockDataConfig
 from home_state_models import HomeStateRequest, Action, DeviceType, ActionType
 
-
-async def test_heatwave_scenario():
-    """Test the extreme heat wave scenario"""
-    print("🌡️  Testing Heat Wave Scenario")
+class Scenario(NamedTuple):
+    """A mock-data pipeline scenario: display name, header line and mock files"""
+    name: str
+    header: str
+    weather_file: str
+    grid_file: str
+    detailed: bool = False
+
+
+SCENARIOS = [
+    Scenario("Heat Wave Scenario", "🌡️  Testing Heat Wave Scenario",
+             "mock_weather_data.json", "mock_grid_data.json", detailed=True),
+    Scenario("Normal Conditions", "\n\n🌤️  Testing Normal Conditions Scenario",
+             "mock_weather_normal.json", "mock_grid_normal.json"),
+    Scenario("Severe Thunderstorm", "\n\n⛈️  Testing Severe Thunderstorm Scenario",
+             "mock_weather_storm.json", "mock_grid_data.json"),
+    Scenario("Grid Outage", "\n\n⚡ Testing Grid Outage Scenario",
+             "mock_weather_storm.json", "mock_grid_outage.json"),
+]
+
+
+async def _run_scenario(scenario: Scenario, orchestrator: AgentOrchestrator):
+    """Run the pipeline against one scenario's mock data and report the results"""
+    print(scenario.header)
     print("=" * 50)
     
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
-    # Configure for heat wave scenario
-    from threat_models import MockDataConfig
     mock_config = MockDataConfig(
         use_mock_weather=True,
         use_mock_grid=True,
-        mock_weather_file="mock_weather_data.json",
-        mock_grid_file="mock_grid_data.json"
+        mock_weather_file=scenario.weather_file,
+        mock_grid_file=scenario.grid_file
     )
-    orchestrator.threat_agent.update_mock_config(mock_config)
     
     try:
+        orchestrator.threat_agent.update_mock_config(mock_config)
         result = await orchestrator.process_threat_to_action(
             location="Austin, TX",
             include_research=False
@@ -54,22 +70,26 @@ async def test_heatwave_scenario():
             print(f"   Overall Level: {analysis.overall_threat_level}")
             print(f"   Threat Types: {analysis.threat_types}")
             print(f"   Confidence: {analysis.confidence_score:.2f}")
-            print(f"   Summary: {analysis.analysis_summary}")
-            
-            print(f"\n⚠️  Primary Concerns:")
-            for concern in analysis.primary_concerns:
-                print(f"   • {concern}")
             
-            print(f"\n💡 Recommended Actions:")
-            for action in analysis.recommended_actions:
-                print(f"   • {action}")
+            if scenario.detailed:
+                print(f"   Summary: {analysis.analysis_summary}")
+                
+                print(f"\n⚠️  Primary Concerns:")
+                if analysis.primary_concerns:
+                    print("\n".join(f"   • {concern}" for concern in analysis.primary_concerns))
+                
+                print(f"\n💡 Recommended Actions:")
+                if analysis.recommended_actions:
+                    print("\n".join(f"   • {action}" for action in analysis.recommended_actions))
         
+        print(f"\n🏠 Home Actions Generated: {len(result.get('home_actions', []))}")
         if result.get('home_actions'):
-            print(f"\n🏠 Home Actions Generated: {len(result['home_actions'])}")
-            for i, action in enumerate(result['home_actions'], 1):
-                print(f"   {i}. {action.device_type}: {action.action_type} - {action.parameters}")
+            print("\n".join(
+                f"   {i}. {action.device_type}: {action.action_type} - {action.parameters}"
+                for i, action in enumerate(result['home_actions'], 1)
+            ))
         
-        if result.get('home_state'):
+        if scenario.detailed and result.get('home_state'):
             home_state = result['home_state']
             print(f"\n🏡 Final Home State:")
             print(f"   Home ID: {home_state.metadata.home_id}")
@@ -77,164 +97,24 @@ async def test_heatwave_scenario():
             print(f"   Devices: {len(home_state.devices)}")
             
             # Show device states
-            for device_type, device in home_state.devices.items():
-                print(f"   • {device_type}: {device.properties}")
+            if home_state.devices:
+                print("\n".join(f"   • {device_type}: {device.properties}" for device_type, device in home_state.devices.items()))
         
         return True
         
     except Exception as e:
-        print(f"❌ Heat wave scenario failed: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ {scenario.name} failed: {e}")
+        if scenario.detailed:
+            import traceback
+            traceback.print_exc()
         return False
 
 
-async def test_normal_scenario():
-    """Test the normal conditions scenario"""
-    print("\n\n🌤️  Testing Normal Conditions Scenario")
-    print("=" * 50)
-    
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
-    # Configure for normal scenario
-    from threat_models import MockDataConfig
-    mock_config = MockDataConfig(
-        use_mock_weather=True,
-        use_mock_grid=True,
-        mock_weather_file="mock_weather_normal.json",
-        mock_grid_file="mock_grid_normal.json"
-    )
-    orchestrator.threat_agent.update_mock_config(mock_config)
-    
-    try:
-        result = await orchestrator.process_threat_to_action(
-            location="Austin, TX",
-            include_research=False
-        )
-        
-        print(f"✅ Pipeline completed successfully")
-        print(f"   Processing Time: {result.get('processing_time_ms', 0):.2f}ms")
-        
-        if result.get('threat_analysis'):
-            analysis = result['threat_analysis']
-            print(f"\n🔍 Threat Analysis:")
-            print(f"   Overall Level: {analysis.overall_threat_level}")
-            print(f"   Threat Types: {analysis.threat_types}")
-            print(f"   Confidence: {analysis.confidence_score:.2f}")
-        
-        print(f"\n🏠 Home Actions Generated: {len(result.get('home_actions', []))}")
-        if result.get('home_actions'):
-            for i, action in enumerate(result['home_actions'], 1):
-                print(f"   {i}. {action.device_type}: {action.action_type} - {action.parameters}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Normal scenario failed: {e}")
-        return False
-
-
-async def test_storm_scenario():
-    """Test the severe thunderstorm scenario"""
-    print("\n\n⛈️  Testing Severe Thunderstorm Scenario")
-    print("=" * 50)
-    
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
-    # Configure for storm scenario
-    from threat_models import MockDataConfig
-    mock_config = MockDataConfig(
-        use_mock_weather=True,
-        use_mock_grid=True,
-        mock_weather_file="mock_weather_storm.json",
-        mock_grid_file="mock_grid_data.json"
-    )
-    orchestrator.threat_agent.update_mock_config(mock_config)
-    
-    try:
-        result = await orchestrator.process_threat_to_action(
-            location="Austin, TX",
-            include_research=False
-        )
-        
-        print(f"✅ Pipeline completed successfully")
-        print(f"   Processing Time: {result.get('processing_time_ms', 0):.2f}ms")
-        
-        if result.get('threat_analysis'):
-            analysis = result['threat_analysis']
-            print(f"\n🔍 Threat Analysis:")
-            print(f"   Overall Level: {analysis.overall_threat_level}")
-            print(f"   Threat Types: {analysis.threat_types}")
-            print(f"   Confidence: {analysis.confidence_score:.2f}")
-        
-        print(f"\n🏠 Home Actions Generated: {len(result.get('home_actions', []))}")
-        if result.get('home_actions'):
-            for i, action in enumerate(result['home_actions'], 1):
-                print(f"   {i}. {action.device_type}: {action.action_type} - {action.parameters}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Storm scenario failed: {e}")
-        return False
-
-
-async def test_outage_scenario():
-    """Test the grid outage scenario"""
-    print("\n\n⚡ Testing Grid Outage Scenario")
-    print("=" * 50)
-    
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
-    # Configure for outage scenario
-    from threat_models import MockDataConfig
-    mock_config = MockDataConfig(
-        use_mock_weather=True,
-        use_mock_grid=True,
-        mock_weather_file="mock_weather_storm.json",
-        mock_grid_file="mock_grid_outage.json"
-    )
-    orchestrator.threat_agent.update_mock_config(mock_config)
-    
-    try:
-        result = await orchestrator.process_threat_to_action(
-            location="Austin, TX",
-            include_research=False
-        )
-        
-        print(f"✅ Pipeline completed successfully")
-        print(f"   Processing Time: {result.get('processing_time_ms', 0):.2f}ms")
-        
-        if result.get('threat_analysis'):
-            analysis = result['threat_analysis']
-            print(f"\n🔍 Threat Analysis:")
-            print(f"   Overall Level: {analysis.overall_threat_level}")
-            print(f"   Threat Types: {analysis.threat_types}")
-            print(f"   Confidence: {analysis.confidence_score:.2f}")
-        
-        print(f"\n🏠 Home Actions Generated: {len(result.get('home_actions', []))}")
-        if result.get('home_actions'):
-            for i, action in enumerate(result['home_actions'], 1):
-                print(f"   {i}. {action.device_type}: {action.action_type} - {action.parameters}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Outage scenario failed: {e}")
-        return False
-
-
-async def test_system_status():
+async def test_system_status(orchestrator: AgentOrchestrator):
     """Test system status and health checks"""
     print("\n\n📊 Testing System Status")
     print("=" * 50)
     
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
     try:
         status = await orchestrator.get_system_status()
         
@@ -262,22 +142,22 @@ async def test_system_status():
         return False
 
 
-async def test_threat_action_mapping():
+async def test_threat_action_mapping(orchestrator: AgentOrchestrator):
     """Test threat-to-action mapping functionality"""
     print("\n\n🗺️  Testing Threat-Action Mapping")
     print("=" * 50)
     
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
-    
     try:
         mapping = orchestrator.get_threat_action_mapping()
         
         print(f"✅ Threat-Action Mapping Retrieved:")
         for threat_type, actions in mapping.items():
             print(f"\n   {threat_type.upper()}:")
-            for i, action in enumerate(actions, 1):
-                print(f"     {i}. {action['device_type']}: {action['action_type']} - {action['description']}")
+            if actions:
+                print("\n".join(
+                    f"     {i}. {action['device_type']}: {action['action_type']} - {action['description']}"
+                    for i, action in enumerate(actions, 1)
+                ))
         
         return True
         
@@ -297,30 +177,43 @@ async def main():
     print("=" * 60)
     
     tests = [
-        ("Heat Wave Scenario", test_heatwave_scenario),
-        ("Normal Conditions", test_normal_scenario),
-        ("Severe Thunderstorm", test_storm_scenario),
-        ("Grid Outage", test_outage_scenario),
+        *[(scenario.name, functools.partial(_run_scenario, scenario)) for scenario in SCENARIOS],
         ("System Status", test_system_status),
         ("Threat-Action Mapping", test_threat_action_mapping)
     ]
     
-    passed = 0
-    total = len(tests)
+    # One orchestrator for the whole suite; initialization is the expensive part
+    # Mock files are parsed on worker threads while the orchestrator initializes
+    orchestrator = AgentOrchestrator()
+    mock_files = sorted({f for scenario in SCENARIOS for f in (scenario.weather_file, scenario.grid_file)})
+    await asyncio.gather(
+        orchestrator.initialize(),
+        orchestrator.threat_agent.mock_client.preload(mock_files)
+    )
     
+    # Tests run in order: the scenarios share the orchestrator and swap its mock data config
+    outcomes = []
     for test_name, test_func in tests:
         print(f"\n🧪 Running: {test_name}")
         try:
-            success = await test_func()
+            success = await test_func(orchestrator)
             if success:
-                passed += 1
                 print(f"✅ {test_name} PASSED")
             else:
                 print(f"❌ {test_name} FAILED")
         except Exception as e:
+            success = False
             print(f"❌ {test_name} FAILED with exception: {e}")
+        outcomes.append((test_name, bool(success)))
     
-    print(f"\n📊 Test Results: {passed}/{total} tests passed")
+    passed = sum(1 for _, success in outcomes if success)
+    total = len(tests)
+    
+    report = ["\n📋 Summary:\n"]
+    report.extend(f"   {'✅' if success else '❌'} {test_name}\n" for test_name, success in outcomes)
+    report.append(f"\n📊 Test Results: {passed}/{total} tests passed\n")
+    sys.stdout.write("".join(report))
+    sys.stdout.flush()
     
     if passed == total:
         print("\n🎉 ALL TESTS PASSED!")
@@ -337,4 +230,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Faster event loop where available; the stdlib loop is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -5,11 +5,24 @@ Test call to backup number +19252525115
 
 import asyncio
 import os
+import sys
 import time
 import httpx
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Add the backend src directory to the path so the backend's phone normalizer is shared
+sys.path.insert(0, str(Path(__file__).parent / "services" / "backend" / "src"))
+
+from backend.voice_alerts import to_e164
+
 
 class AgentverseVoiceService:
     def __init__(self):
@@ -23,15 +36,44 @@ class AgentverseVoiceService:
             print("✅ VAPI configured - making REAL calls")
             self.simulate_mode = False
 
-    def send_warning_call(self, phone_number: str, homeowner_name: str = "Homeowner"):
+        # One client for every call so repeat calls reuse the warm connection;
+        # auth headers are set once as client defaults
+        self._client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+        
+        # Parts of the call payload that are the same for every call
+        self._payload_template = {
+            "phoneNumberId": self.phone_number_id,
+            "assistant": {
+                "model": {
+                    "provider": "openai",
+                    "model": "gpt-3.5-turbo"
+                },
+                "voice": {
+                    "provider": "11labs",
+                    "voiceId": "21m00Tcm4TlvDq8ikWAM"
+                },
+                "endCallMessage": "Thank you for using AURA. Goodbye.",
+                "endCallPhrases": ["goodbye", "bye", "thank you", "thanks"]
+            }
+        }
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+
+    async def send_warning_call(self, phone_number: str, homeowner_name: str = "Homeowner"):
         """Send a warning call about weather event"""
         
         # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
+        phone_number = to_e164(phone_number)
         
         message = f"This is AURA. Our analyst agents have detected a 92% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?"
         
@@ -44,17 +86,13 @@ class AgentverseVoiceService:
                 "message": "Warning call simulated successfully"
             }
         
-        return self._make_vapi_call(phone_number, message, "warning")
+        return await self._make_vapi_call(phone_number, message, "warning")
     
-    def send_resolution_call(self, phone_number: str, profit: float = 4.15):
+    async def send_resolution_call(self, phone_number: str, profit: float = 4.15):
         """Send a resolution call with final report"""
         
         # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
+        phone_number = to_e164(phone_number)
         
         message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${profit:.2f}. The situation is managed."
         
@@ -67,38 +105,56 @@ class AgentverseVoiceService:
                 "message": "Resolution call simulated successfully"
             }
         
-        return self._make_vapi_call(phone_number, message, "resolution")
+        return await self._make_vapi_call(phone_number, message, "resolution")
+    
+    async def wait_for_call_status(self, call_result: Dict[str, Any], statuses: set, timeout: float):
+        """
+        Poll VAPI until the call reaches one of the given statuses or the timeout passes.
+        The poll interval doubles from 1s up to 5s. Returns the last status seen.
+        """
+        if self.simulate_mode or not call_result.get("success"):
+            return None
+        
+        url = f"https://api.vapi.ai/call/{call_result['call_id']}"
+        status = None
+        
+        async def _poll():
+            nonlocal status
+            interval = 1.0
+            while True:
+                response = await self._client.get(url)
+                if response.status_code == 200:
+                    status = response.json().get("status")
+                    if status in statuses:
+                        return
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, 5.0)
+        
+        try:
+            await asyncio.wait_for(_poll(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ Call still '{status}' after {timeout:.0f} seconds, continuing")
+        except httpx.HTTPError as e:
+            print(f"⚠️ Could not poll call status: {str(e)}")
+        return status
     
-    def _make_vapi_call(self, phone_number: str, message: str, call_type: str):
+    async def _make_vapi_call(self, phone_number: str, message: str, call_type: str):
         """Make actual VAPI call"""
         try:
             url = "https://api.vapi.ai/call"
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
             
             payload = {
-                "phoneNumberId": self.phone_number_id,
+                **self._payload_template,
                 "customer": {
                     "number": phone_number
                 },
                 "assistant": {
-                    "model": {
-                        "provider": "openai",
-                        "model": "gpt-3.5-turbo"
-                    },
-                    "voice": {
-                        "provider": "11labs",
-                        "voiceId": "21m00Tcm4TlvDq8ikWAM"
-                    },
-                    "firstMessage": message,
-                    "endCallMessage": "Thank you for using AURA. Goodbye.",
-                    "endCallPhrases": ["goodbye", "bye", "thank you", "thanks"]
+                    **self._payload_template["assistant"],
+                    "firstMessage": message
                 }
             }
             
-            response = httpx.post(url, headers=headers, json=payload, timeout=30)
+            response = await self._client.post(url, json=payload)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -139,66 +195,70 @@ async def test_backup_call():
     # Initialize voice service
     voice_service = AgentverseVoiceService()
     
-    # Backup number
-    phone_number = "+19252525115"
-    
-    print(f"📞 Testing with backup number: {phone_number}")
-    
-    # Step 1: Send permission call
-    print(f"\n🚨 Step 1: Sending PERMISSION call to backup number")
-    print("-" * 50)
-    
-    permission_result = voice_service.send_warning_call(phone_number, "Backup User")
-    print(f"Permission Call Result:")
-    print(f"  Success: {permission_result['success']}")
-    print(f"  Call ID: {permission_result.get('call_id', 'N/A')}")
-    print(f"  Message: {permission_result['message']}")
-    
-    # Wait for permission call to be answered
-    print(f"\n⏳ Waiting 30 seconds for permission call to be answered...")
-    await asyncio.sleep(30)
-    
-    # Step 2: Simulate pipeline execution
-    print(f"\n🔍 Step 2: Simulating threat analysis and home actions")
-    print("-" * 50)
-    print("   - Analyzing threats for Austin, TX")
-    print("   - Detected: 92% probability heatwave at 4 PM")
-    print("   - Generating home actions...")
-    print("   - Charging battery to 100%")
-    print("   - Pre-cooling home to 68°F")
-    print("   - Preparing for energy sale")
-    print("   - Executing energy sale: $4.15 profit generated")
-    print("   - Pipeline completed successfully")
-    
-    # Wait before sending completion call
-    print(f"\n⏳ Waiting 10 seconds before sending completion call...")
-    await asyncio.sleep(10)
-    
-    # Step 3: Send completion call
-    print(f"\n✅ Step 3: Sending COMPLETION call to backup number")
-    print("-" * 50)
-    
-    completion_result = voice_service.send_resolution_call(phone_number, profit=4.15)
-    print(f"Completion Call Result:")
-    print(f"  Success: {completion_result['success']}")
-    print(f"  Call ID: {completion_result.get('call_id', 'N/A')}")
-    print(f"  Message: {completion_result['message']}")
-    
-    # Summary
-    print(f"\n📊 Backup Call Test Summary:")
-    print(f"  Permission call: {'✅ Success' if permission_result['success'] else '❌ Failed'}")
-    print(f"  Completion call: {'✅ Success' if completion_result['success'] else '❌ Failed'}")
-    
-    if permission_result['success'] and completion_result['success']:
-        print(f"\n🎉 SUCCESS! Both backup calls were initiated successfully!")
-        print(f"   You should receive 2 calls on {phone_number}")
-        print(f"   1. Permission call asking for home preparation")
-        print(f"   2. Completion call with final results")
-    else:
-        print(f"\n❌ Some backup calls failed. Check the error messages above.")
-    
-    print(f"\n✅ Backup call test completed!")
+    try:
+        # Backup number
+        phone_number = "+19252525115"
+        
+        print(f"📞 Testing with backup number: {phone_number}")
+        
+        # Step 1: Send permission call
+        print(f"\n🚨 Step 1: Sending PERMISSION call to backup number")
+        print("-" * 50)
+        
+        permission_result = await voice_service.send_warning_call(phone_number, "Backup User")
+        print(f"Permission Call Result:")
+        print(f"  Success: {permission_result['success']}")
+        print(f"  Call ID: {permission_result.get('call_id', 'N/A')}")
+        print(f"  Message: {permission_result['message']}")
+        
+        # Wait for permission call to be answered
+        print(f"\n⏳ Waiting up to 30 seconds for permission call to be answered...")
+        await voice_service.wait_for_call_status(permission_result, {"in-progress", "ended"}, timeout=30)
+        
+        # Step 2: Simulate pipeline execution
+        print(f"\n🔍 Step 2: Simulating threat analysis and home actions")
+        print("-" * 50)
+        print("   - Analyzing threats for Austin, TX")
+        print("   - Detected: 92% probability heatwave at 4 PM")
+        print("   - Generating home actions...")
+        print("   - Charging battery to 100%")
+        print("   - Pre-cooling home to 68°F")
+        print("   - Preparing for energy sale")
+        print("   - Executing energy sale: $4.15 profit generated")
+        print("   - Pipeline completed successfully")
+        
+        # Let the permission call finish before sending completion call
+        print(f"\n⏳ Waiting up to 10 seconds for permission call to end...")
+        await voice_service.wait_for_call_status(permission_result, {"ended"}, timeout=10)
+        
+        # Step 3: Send completion call
+        print(f"\n✅ Step 3: Sending COMPLETION call to backup number")
+        print("-" * 50)
+        
+        completion_result = await voice_service.send_resolution_call(phone_number, profit=4.15)
+        print(f"Completion Call Result:")
+        print(f"  Success: {completion_result['success']}")
+        print(f"  Call ID: {completion_result.get('call_id', 'N/A')}")
+        print(f"  Message: {completion_result['message']}")
+        
+        # Summary
+        print(f"\n📊 Backup Call Test Summary:")
+        print(f"  Permission call: {'✅ Success' if permission_result['success'] else '❌ Failed'}")
+        print(f"  Completion call: {'✅ Success' if completion_result['success'] else '❌ Failed'}")
+        
+        if permission_result['success'] and completion_result['success']:
+            print(f"\n🎉 SUCCESS! Both backup calls were initiated successfully!")
+            print(f"   You should receive 2 calls on {phone_number}")
+            print(f"   1. Permission call asking for home preparation")
+            print(f"   2. Completion call with final results")
+        else:
+            print(f"\n❌ Some backup calls failed. Check the error messages above.")
+        
+        print(f"\n✅ Backup call test completed!")
+    finally:
+        await voice_service.aclose()
 
 
 if __name__ == "__main__":
     asyncio.run(test_backup_call())
+
@@ -5,35 +5,59 @@ Test both warning and resolution calls
 
 import asyncio
 import os
+import sys
 import time
 import httpx
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
-class AURAVoiceService:
-    def __init__(self):
-        self.api_key = os.getenv("VAPI_API_KEY")
-        self.phone_number_id = os.getenv("VAPI_PHONE_NUMBER_ID")
-        
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
+# Add the backend src directory to the path so the backend's phone normalizer is shared
+sys.path.insert(0, str(Path(__file__).parent / "services" / "backend" / "src"))
+
+from backend.voice_alerts import to_e164
+
+# Error bodies are echoed into results; cap how much of one is read and decoded
+_MAX_ERROR_BODY = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class _Creds:
+    api_key: Optional[str]
+    phone_number_id: Optional[str]
+    
+    def validate(self):
+        """Raise if either VAPI credential is missing"""
         if not self.api_key or not self.phone_number_id:
-            print("❌ VAPI credentials not configured!")
-            exit(1)
-        else:
-            print("✅ VAPI configured - making REAL calls")
+            raise RuntimeError("VAPI credentials not configured!")
 
-    async def send_warning_call(self, phone_number: str, message: str) -> Dict[str, Any]:
-        """Send the warning call to homeowner"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
-        
-        # Create assistant context for the warning call
-        assistant_context = f"""
+
+# VAPI credentials are read from the environment once, at import
+CREDS = _Creds(os.getenv("VAPI_API_KEY"), os.getenv("VAPI_PHONE_NUMBER_ID"))
+
+
+class AURAVoiceService:
+    # Static assistant prompts; only the alert text and profit vary per call
+    WARNING_TEMPLATE = """
 You are AURA, an AI smart home management system. You are calling a homeowner about a potential weather event.
 
 URGENT ALERT: {message}
@@ -48,85 +72,18 @@ INSTRUCTIONS:
 
 Remember: You are a helpful AI assistant managing their smart home. Be reassuring but urgent about the situation.
 """
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                call_payload = {
-                    "phoneNumberId": self.phone_number_id,
-                    "customer": {"number": phone_number},
-                    "assistant": {
-                        "firstMessage": f"This is AURA. {message}",
-                        "model": {
-                            "provider": "xai",
-                            "model": "grok-3",
-                            "temperature": 0.1,
-                            "messages": [
-                                {"role": "system", "content": assistant_context},
-                                {
-                                    "role": "user",
-                                    "content": message,
-                                },
-                            ],
-                        },
-                        "voice": {"provider": "11labs", "voiceId": "burt"},
-                    },
-                }
-
-                print(f"📞 Making WARNING call to {phone_number}")
-                
-                response = await client.post(
-                    "https://api.vapi.ai/call",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=call_payload,
-                )
-
-                if response.status_code == 201:
-                    call_data = response.json()
-                    return {
-                        "success": True,
-                        "call_id": call_data.get("id"),
-                        "message": "Warning call initiated successfully"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code} - {response.text}"
-                    }
-
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
 
-    async def send_resolution_call(self, phone_number: str, profit: float = 4.15) -> Dict[str, Any]:
-        """Send the resolution call with final report"""
-        
-        # Ensure phone number is in E.164 format
-        if not phone_number.startswith('+'):
-            if phone_number.startswith('1') and len(phone_number) == 11:
-                phone_number = '+' + phone_number
-            elif len(phone_number) == 10:
-                phone_number = '+1' + phone_number
-        
-        # Create the resolution message
-        resolution_message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${profit:.2f}. The situation is managed."
-        
-        # Create assistant context for the resolution call
-        assistant_context = f"""
+    RESOLUTION_TEMPLATE = """
 You are AURA, an AI smart home management system. You are calling a homeowner with a final report after successfully managing a weather event.
 
-FINAL REPORT: {resolution_message}
+FINAL REPORT: {message}
 
 INSTRUCTIONS:
 1. Clearly communicate the final report message above
 2. Provide a brief summary of what was accomplished:
    - Home is now secure and operating on battery power
    - Energy sale was successful
-   - Profit generated: ${profit:.2f}
+   - Profit generated: ${profit}
    - Situation is fully managed
 3. Ask if they have any questions about the actions taken
 4. Keep the conversation brief and professional
@@ -134,59 +91,144 @@ INSTRUCTIONS:
 
 Remember: You are providing a positive update about successful home protection. Be confident and reassuring.
 """
+
+    def __init__(self):
+        self.creds = CREDS
+        self.creds.validate()
+        
+        # One client for both calls so the second reuses the first's connection
+        self._client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=32, keepalive_expiry=30.0),
+            headers={
+                "Authorization": f"Bearer {self.creds.api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+        
+        # Invariant parts of the call payload, built once
+        self._payload_skeleton = {
+            "phoneNumberId": self.creds.phone_number_id,
+            "assistant": {
+                "model": {"provider": "xai", "model": "grok-3", "temperature": 0.1},
+                "voice": {"provider": "11labs", "voiceId": "burt"},
+            },
+        }
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def wait_for_call_complete(self, call_id: Optional[str], timeout: float) -> Optional[str]:
+        """
+        Poll the call's status until it has ended or failed, backing off up to 5s between polls.
+        Returns the last status seen, or None if there was no call to wait on.
+        """
+        if not call_id:
+            return None
         
-        async with httpx.AsyncClient() as client:
-            try:
-                call_payload = {
-                    "phoneNumberId": self.phone_number_id,
-                    "customer": {"number": phone_number},
-                    "assistant": {
-                        "firstMessage": resolution_message,
-                        "model": {
-                            "provider": "xai",
-                            "model": "grok-3",
-                            "temperature": 0.1,
-                            "messages": [
-                                {"role": "system", "content": assistant_context},
-                                {
-                                    "role": "user",
-                                    "content": resolution_message,
-                                },
-                            ],
-                        },
-                        "voice": {"provider": "11labs", "voiceId": "burt"},
-                    },
-                }
-
-                print(f"📞 Making RESOLUTION call to {phone_number}")
-                
-                response = await client.post(
-                    "https://api.vapi.ai/call",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=call_payload,
-                )
+        status = None
+        
+        async def _poll():
+            nonlocal status
+            attempt = 0
+            while True:
+                response = await self._client.get(f"https://api.vapi.ai/call/{call_id}")
+                if response.status_code == 200:
+                    status = response.json().get("status")
+                    if status in ("ended", "failed"):
+                        return
+                await asyncio.sleep(min(2 ** attempt, 5))
+                attempt += 1
+        
+        try:
+            await asyncio.wait_for(_poll(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ Call {call_id} still '{status}' after {timeout:.0f} seconds, continuing")
+        except httpx.HTTPError as e:
+            print(f"⚠️ Could not poll call {call_id}: {str(e)}")
+        return status
+
+    def _build_payload(self, phone_number: str, first_message: str, assistant_context: str, user_message: str) -> Dict[str, Any]:
+        """Fill the per-call fields into a copy of the payload skeleton"""
+        assistant = self._payload_skeleton["assistant"]
+        return {
+            **self._payload_skeleton,
+            "customer": {"number": phone_number},
+            "assistant": {
+                **assistant,
+                "firstMessage": first_message,
+                "model": {
+                    **assistant["model"],
+                    "messages": [
+                        {"role": "system", "content": assistant_context},
+                        {"role": "user", "content": user_message},
+                    ],
+                },
+            },
+        }
 
+    async def _post_call(
+        self, phone_number: str, first_message: str, assistant_context: str, user_message: str, call_kind: str
+    ) -> Dict[str, Any]:
+        """Normalize the number, place the call and wrap the outcome in a result dict"""
+        
+        try:
+            # Ensure phone number is in E.164 format
+            phone_number = to_e164(phone_number)
+            
+            call_payload = self._build_payload(phone_number, first_message, assistant_context, user_message)
+
+            print(f"📞 Making {call_kind.upper()} call to {phone_number}")
+            
+            # Stream the response so an error body is only read up to the cap
+            async with self._client.stream("POST", "https://api.vapi.ai/call", content=_json_dumps(call_payload)) as response:
                 if response.status_code == 201:
-                    call_data = response.json()
+                    call_data = _json_loads(await response.aread())
                     return {
                         "success": True,
                         "call_id": call_data.get("id"),
-                        "message": "Resolution call initiated successfully"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code} - {response.text}"
+                        "message": f"{call_kind} call initiated successfully"
                     }
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= _MAX_ERROR_BODY:
+                        break
+            error = f"API error: {response.status_code} - {body[:_MAX_ERROR_BODY].decode(errors='replace')}"
+        except Exception as e:
+            error = str(e)
+        return {
+            "success": False,
+            "error": error
+        }
+
+    async def send_warning_call(self, phone_number: str, message: str) -> Dict[str, Any]:
+        """Send the warning call to homeowner"""
+        
+        # Create assistant context for the warning call
+        assistant_context = self.WARNING_TEMPLATE.format(message=message)
+        
+        return await self._post_call(phone_number, f"This is AURA. {message}", assistant_context, message, "Warning")
 
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
+    async def send_resolution_call(self, phone_number: str, profit: float = 4.15) -> Dict[str, Any]:
+        """Send the resolution call with final report"""
+        
+        # Create the resolution message
+        profit_str = f"{profit:.2f}"
+        resolution_message = f"This is AURA with a final report. The home is now secure and operating on battery power. The energy sale was successful, generating a profit of ${profit_str}. The situation is managed."
+        
+        # Create assistant context for the resolution call
+        assistant_context = self.RESOLUTION_TEMPLATE.format(message=resolution_message, profit=profit_str)
+        
+        return await self._post_call(phone_number, resolution_message, assistant_context, resolution_message, "Resolution")
 
 
 async def test_both_calls():
@@ -194,65 +236,78 @@ async def test_both_calls():
     print("📞 Testing Both Warning and Resolution Calls")
     print("=" * 60)
     
-    # Initialize voice service
-    voice_service = AURAVoiceService()
-    
-    # Test number
-    phone_number = "+19259892492"
-    
-    # Step 1: Send warning call
-    print("\n🚨 Step 1: Sending WARNING call")
-    print("-" * 40)
-    
-    warning_message = "Our analyst agents have detected a 92% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?"
-    
-    warning_result = await voice_service.send_warning_call(phone_number, warning_message)
-    
-    print(f"Warning Call Result:")
-    print(f"Success: {warning_result.get('success', False)}")
-    print(f"Call ID: {warning_result.get('call_id', 'N/A')}")
-    print(f"Message: {warning_result.get('message', 'N/A')}")
-    
-    if warning_result.get('error'):
-        print(f"Error: {warning_result.get('error')}")
-    
-    # Wait for warning call to be answered (30 seconds)
-    print(f"\n⏳ Waiting 30 seconds for warning call to be answered...")
-    await asyncio.sleep(30)
-    
-    # Step 2: Simulate home actions (battery charging, AC cooling, etc.)
-    print(f"\n🏠 Step 2: Simulating home actions")
-    print("-" * 40)
-    print("   - Charging battery to 100%")
-    print("   - Pre-cooling home to 68°F")
-    print("   - Preparing for energy sale")
-    print("   - Actions completed successfully")
-    
-    # Wait a bit more before sending resolution call
-    print(f"\n⏳ Waiting 10 seconds before sending resolution call...")
-    await asyncio.sleep(10)
-    
-    # Step 3: Send resolution call
-    print(f"\n✅ Step 3: Sending RESOLUTION call")
-    print("-" * 40)
-    
-    resolution_result = await voice_service.send_resolution_call(phone_number, profit=4.15)
-    
-    print(f"Resolution Call Result:")
-    print(f"Success: {resolution_result.get('success', False)}")
-    print(f"Call ID: {resolution_result.get('call_id', 'N/A')}")
-    print(f"Message: {resolution_result.get('message', 'N/A')}")
-    
-    if resolution_result.get('error'):
-        print(f"Error: {resolution_result.get('error')}")
-    
-    # Summary
-    print(f"\n📊 Summary:")
-    print(f"Warning call: {'✅ Success' if warning_result.get('success') else '❌ Failed'}")
-    print(f"Resolution call: {'✅ Success' if resolution_result.get('success') else '❌ Failed'}")
-    
-    print(f"\n✅ Both calls test completed!")
+    # Initialize voice service; the context manager closes its client on exit
+    async with AURAVoiceService() as voice_service:
+        # Test number
+        phone_number = "+19259892492"
+        
+        # Step 1: Send warning call
+        print("\n🚨 Step 1: Sending WARNING call")
+        print("-" * 40)
+        
+        warning_message = "Our analyst agents have detected a 92% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?"
+        
+        warning_result = await voice_service.send_warning_call(phone_number, warning_message)
+        
+        print(f"Warning Call Result:")
+        print(f"Success: {warning_result.get('success', False)}")
+        print(f"Call ID: {warning_result.get('call_id', 'N/A')}")
+        print(f"Message: {warning_result.get('message', 'N/A')}")
+        
+        if warning_result.get('error'):
+            print(f"Error: {warning_result.get('error')}")
+        
+        # Wait for warning call to be answered (30 seconds), moving on early if it has already ended
+        print(f"\n⏳ Waiting up to 30 seconds for warning call to be answered...")
+        await voice_service.wait_for_call_complete(warning_result.get("call_id"), timeout=30)
+        
+        # Step 2: Simulate home actions (battery charging, AC cooling, etc.)
+        print(f"\n🏠 Step 2: Simulating home actions")
+        print("-" * 40)
+        print("   - Charging battery to 100%")
+        print("   - Pre-cooling home to 68°F")
+        print("   - Preparing for energy sale")
+        print("   - Actions completed successfully")
+        
+        # Wait a bit more before sending resolution call
+        print(f"\n⏳ Waiting 10 seconds before sending resolution call...")
+        await asyncio.sleep(10)
+        
+        # Step 3: Send resolution call
+        print(f"\n✅ Step 3: Sending RESOLUTION call")
+        print("-" * 40)
+        
+        resolution_result = await voice_service.send_resolution_call(phone_number, profit=4.15)
+        
+        print(f"Resolution Call Result:")
+        print(f"Success: {resolution_result.get('success', False)}")
+        print(f"Call ID: {resolution_result.get('call_id', 'N/A')}")
+        print(f"Message: {resolution_result.get('message', 'N/A')}")
+        
+        if resolution_result.get('error'):
+            print(f"Error: {resolution_result.get('error')}")
+        
+        # Summary
+        print(f"\n📊 Summary:")
+        print(f"Warning call: {'✅ Success' if warning_result.get('success') else '❌ Failed'}")
+        print(f"Resolution call: {'✅ Success' if resolution_result.get('success') else '❌ Failed'}")
+        
+        print(f"\n✅ Both calls test completed!")
 
 
 if __name__ == "__main__":
+    # Faster event loop where available; the stdlib loop is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
+    # Check credentials up front so a misconfigured run exits before any client is built
+    try:
+        CREDS.validate()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("✅ VAPI configured - making REAL calls")
     asyncio.run(test_both_calls())
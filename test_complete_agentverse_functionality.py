@@ -22,6 +22,12 @@ os.environ["VAPI_PHONE_NUMBER_ID"] = "7fad3e7f-a086-4e6d-b516-35a4c5523036"
 from agent_orchestrator import AgentOrchestrator
 from models import HomeownerRegistration
 
+# Trusted constants, so they are built once and skip validation
+HOMEOWNERS = (
+    HomeownerRegistration.model_construct(name="John Smith", phone_number="+19259892492"),
+    HomeownerRegistration.model_construct(name="Jane Doe", phone_number="+14155797749"),
+)
+
 
 async def test_complete_functionality():
     """Test all agentverse-aura functionality"""
@@ -36,13 +42,8 @@ async def test_complete_functionality():
     print("\n📝 Test 1: Registering homeowners")
     print("-" * 40)
     
-    homeowners = [
-        HomeownerRegistration(name="John Smith", phone_number="+19259892492"),
-        HomeownerRegistration(name="Jane Doe", phone_number="+14155797749")
-    ]
-    
-    for homeowner in homeowners:
-        result = await orchestrator.register_homeowner(homeowner)
+    results = await asyncio.gather(*(orchestrator.register_homeowner(h) for h in HOMEOWNERS))
+    for result in results:
         print(f"Registration: {result}")
     
     # Test 2: Get registered homeowners
@@ -101,6 +102,7 @@ async def test_complete_functionality():
         {"content": "help", "source": "test"}
     ]
     
+    # Sequential on purpose: later messages depend on state set by earlier ones
     for msg in test_messages:
         response = await orchestrator.handle_message(msg)
         print(f"Message: '{msg['content']}' -> Response: {response.get('response', 'No response')[:100]}...")
@@ -110,8 +112,7 @@ async def test_complete_functionality():
     print("-" * 40)
     
     # Re-register homeowners for this test
-    for homeowner in homeowners:
-        await orchestrator.register_homeowner(homeowner)
+    await asyncio.gather(*(orchestrator.register_homeowner(h) for h in HOMEOWNERS))
     
     # This will make real calls
     print("Threat-to-action with calls method available: ✅")
@@ -132,4 +133,10 @@ async def test_complete_functionality():
 
 
 if __name__ == "__main__":
+    # Faster event loop where available; the stdlib loop is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(test_complete_functionality())
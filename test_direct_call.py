@@ -4,6 +4,7 @@ Direct test of phone call functionality
 """
 
 import asyncio
+import logging
 import sys
 import os
 from pathlib import Path
@@ -66,4 +67,6 @@ async def test_direct_call():
 
 
 if __name__ == "__main__":
+    # Simulated calls are logged; show them inline with the printed results
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     asyncio.run(test_direct_call())
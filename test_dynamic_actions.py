@@ -5,6 +5,8 @@ Shows how different temperature and grid conditions generate different actions.
 """
 
 import asyncio
+import contextlib
+import io
 import sys
 from pathlib import Path
 
@@ -13,9 +15,63 @@ backend_dir = Path(__file__).parent / "services" / "backend" / "src"
 sys.path.insert(0, str(backend_dir))
 sys.path.insert(0, str(backend_dir / "backend"))
 
-from agent_orchestrator import AgentOrchestrator
+# get_mock_client comes through the orchestrator module so it is the same shared client
+from agent_orchestrator import AgentOrchestrator, get_mock_client
 from threat_models import MockDataConfig
 
+# Upper bound on scenarios in flight at once
+MAX_CONCURRENT_SCENARIOS = 4
+
+
+def _report_scenario(i: int, scenario: dict, result):
+    """Print one scenario's threat analysis, generated actions and final home state"""
+    print(f"\n🌡️  Scenario {i}: {scenario['name']}")
+    print("-" * 50)
+    
+    if isinstance(result, Exception):
+        print(f"   ❌ Scenario failed: {result}")
+        return
+    
+    if result.get('threat_analysis'):
+        analysis = result['threat_analysis']
+        print(f"   Temperature: {scenario['expected_temp']}°F")
+        print(f"   Threat Level: {analysis.overall_threat_level}")
+        print(f"   Threat Types: {analysis.threat_types}")
+        
+        if analysis.indicators:
+            print(f"   Indicators:")
+            for indicator in analysis.indicators:
+                print(f"     • {indicator.indicator_type}: {indicator.value} "
+                      f"(threshold: {indicator.threshold}, severity: {indicator.severity})")
+    
+    if result.get('home_actions'):
+        print(f"\n   🏠 Dynamic Actions Generated: {len(result['home_actions'])}")
+        for j, action in enumerate(result['home_actions'], 1):
+            print(f"     {j}. {action.device_type}: {action.action_type}")
+            print(f"        Parameters: {action.parameters}")
+        
+        # Show final home state
+        if result.get('home_state'):
+            home_state = result['home_state']
+            print(f"\n   🏡 Final Home State:")
+            for device_type, device in home_state.devices.items():
+                if device_type == "thermostat":
+                    temp = device.properties.get('temperature_f', 'N/A')
+                    mode = device.properties.get('mode', 'N/A')
+                    fan = device.properties.get('fan_mode', 'N/A')
+                    print(f"     • Thermostat: {temp}°F, {mode} mode, fan: {fan}")
+                elif device_type == "battery":
+                    soc = device.properties.get('soc_percent', 'N/A')
+                    backup = device.properties.get('backup_reserve_percent', 'N/A')
+                    print(f"     • Battery: {soc}% SOC, {backup}% backup reserve")
+                elif device_type == "grid":
+                    status = device.properties.get('connection_status', 'N/A')
+                    print(f"     • Grid: {status}")
+    else:
+        print(f"   🏠 No actions generated (normal conditions)")
+    
+    print(f"   ⏱️  Processing Time: {result.get('processing_time_ms', 0):.2f}ms")
+
 
 async def test_dynamic_scenarios():
     """Test different scenarios to show dynamic action generation"""
@@ -49,70 +105,44 @@ async def test_dynamic_scenarios():
         }
     ]
     
-    for i, scenario in enumerate(scenarios, 1):
-        print(f"\n🌡️  Scenario {i}: {scenario['name']}")
-        print("-" * 50)
-        
-        orchestrator = AgentOrchestrator()
-        await orchestrator.initialize()
-        
-        # Configure mock data for this scenario
-        mock_config = MockDataConfig(
-            use_mock_weather=True,
-            use_mock_grid=True,
-            mock_weather_file=scenario["weather_file"],
-            mock_grid_file=scenario["grid_file"]
-        )
-        orchestrator.threat_agent.update_mock_config(mock_config)
-        
-        try:
-            result = await orchestrator.process_threat_to_action(
-                location="Austin, TX",
-                include_research=False
-            )
-            
-            if result.get('threat_analysis'):
-                analysis = result['threat_analysis']
-                print(f"   Temperature: {scenario['expected_temp']}°F")
-                print(f"   Threat Level: {analysis.overall_threat_level}")
-                print(f"   Threat Types: {analysis.threat_types}")
-                
-                if analysis.indicators:
-                    print(f"   Indicators:")
-                    for indicator in analysis.indicators:
-                        print(f"     • {indicator.indicator_type}: {indicator.value} "
-                              f"(threshold: {indicator.threshold}, severity: {indicator.severity})")
-            
-            if result.get('home_actions'):
-                print(f"\n   🏠 Dynamic Actions Generated: {len(result['home_actions'])}")
-                for j, action in enumerate(result['home_actions'], 1):
-                    print(f"     {j}. {action.device_type}: {action.action_type}")
-                    print(f"        Parameters: {action.parameters}")
-                
-                # Show final home state
-                if result.get('home_state'):
-                    home_state = result['home_state']
-                    print(f"\n   🏡 Final Home State:")
-                    for device_type, device in home_state.devices.items():
-                        if device_type == "thermostat":
-                            temp = device.properties.get('temperature_f', 'N/A')
-                            mode = device.properties.get('mode', 'N/A')
-                            fan = device.properties.get('fan_mode', 'N/A')
-                            print(f"     • Thermostat: {temp}°F, {mode} mode, fan: {fan}")
-                        elif device_type == "battery":
-                            soc = device.properties.get('soc_percent', 'N/A')
-                            backup = device.properties.get('backup_reserve_percent', 'N/A')
-                            print(f"     • Battery: {soc}% SOC, {backup}% backup reserve")
-                        elif device_type == "grid":
-                            status = device.properties.get('connection_status', 'N/A')
-                            print(f"     • Grid: {status}")
-            else:
-                print(f"   🏠 No actions generated (normal conditions)")
-            
-            print(f"   ⏱️  Processing Time: {result.get('processing_time_ms', 0):.2f}ms")
+    # Parse each distinct mock file once up front; scenarios share grid files
+    await get_mock_client().preload(
+        sorted({s[key] for s in scenarios for key in ("weather_file", "grid_file")})
+    )
+    
+    # Scenarios run concurrently, each on its own orchestrator so threat and home
+    # state never cross; the mock data cache and voice service are shared
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENARIOS)
+    
+    async def run_scenario(scenario):
+        async with semaphore:
+            scenario_orchestrator = AgentOrchestrator()
+            await scenario_orchestrator.initialize()
             
-        except Exception as e:
-            print(f"   ❌ Scenario failed: {e}")
+            # Configure mock data for this scenario
+            mock_config = MockDataConfig(
+                use_mock_weather=True,
+                use_mock_grid=True,
+                mock_weather_file=scenario["weather_file"],
+                mock_grid_file=scenario["grid_file"]
+            )
+            scenario_orchestrator.threat_agent.update_mock_config(mock_config)
+            try:
+                return await scenario_orchestrator.process_threat_to_action(
+                    location="Austin, TX",
+                    include_research=False
+                )
+            finally:
+                await scenario_orchestrator.threat_agent.close()
+    
+    results = await asyncio.gather(*(run_scenario(s) for s in scenarios), return_exceptions=True)
+    
+    # Render every scenario report into one buffer and write it in a single call
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        for i, (scenario, result) in enumerate(zip(scenarios, results), 1):
+            _report_scenario(i, scenario, result)
+    sys.stdout.write(buffer.getvalue())
     
     print(f"\n🎯 Dynamic Action Generation Summary:")
     print("   • Mild Heat (85°F): Light cooling, minimal battery action")
@@ -122,13 +152,12 @@ async def test_dynamic_scenarios():
     print("\n✅ Actions are now dynamically generated based on threat parameters!")
 
 
-async def test_parameter_extraction():
+async def test_parameter_extraction(orchestrator: AgentOrchestrator):
     """Test the parameter extraction functionality"""
     print("\n\n🔍 Testing Parameter Extraction")
     print("=" * 40)
     
-    orchestrator = AgentOrchestrator()
-    await orchestrator.initialize()
+    orchestrator.home_agent.reset_to_initial_state()
     
     # Test with extreme heat scenario
     mock_config = MockDataConfig(
@@ -169,8 +198,10 @@ async def main():
     print("Testing how different threat parameters generate different actions")
     print("=" * 60)
     
+    # Each dynamic scenario builds its own orchestrator; parameter extraction uses this one
     await test_dynamic_scenarios()
-    await test_parameter_extraction()
+    async with AgentOrchestrator() as orchestrator:
+        await test_parameter_extraction(orchestrator)
     
     print(f"\n🎉 Dynamic Action Generation is working!")
     print("✅ Actions now respond to specific threat parameters")
@@ -180,4 +211,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Faster event loop where available; the stdlib loop is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -5,31 +5,146 @@ Shows how the agent dynamically responds to changing conditions and generates in
 """
 
 import asyncio
+import contextlib
+import dataclasses
+import functools
+import importlib.util
+import io
 import json
+import operator
+import statistics
 import sys
+import tempfile
+import time
+import types
+import weakref
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+    
+    def _json_line(obj):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    
+    def _json_pretty(obj):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _json_line(obj):
+        return (json.dumps(obj, default=str) + "\n").encode()
+    
+    def _json_pretty(obj):
+        return json.dumps(obj, indent=2, default=str)
+
+# --verbose prints each line as it happens instead of once per test section
+VERBOSE = "--verbose" in sys.argv
+
+# Scenario entries are streamed here as newline-delimited JSON, outside the repo
+SCENARIO_LOG_FILE = Path(tempfile.gettempdir()) / "aura_dynamic_scenarios.ndjson"
 
 # Add backend path for imports
-sys.path.append('/Users/eyrinkim/Documents/GitHub/hack-mit-2025/services/backend/src')
+sys.path.append(str(Path(__file__).parent / "services" / "backend" / "src"))
 
-try:
+# Only locate the backend here; the heavy agent/model imports happen in setup_agent
+IMPORTS_AVAILABLE = importlib.util.find_spec("backend") is not None
+if not IMPORTS_AVAILABLE:
+    print("❌ Import error: backend package not found")
+
+def _import_backend():
+    """Import the agent and model symbols the scenarios use, binding them at module scope"""
+    global HomeStateAgent, create_thermostat_action, create_battery_action
+    global create_energy_sale_action, StateValidator
+    global DeviceType, ActionType, Action, HomeStateRequest, BaseModel, _TRACKED_DEVICES
     from backend.home_state_agent import (
         HomeStateAgent, create_thermostat_action, create_battery_action,
         create_energy_sale_action, StateValidator
     )
     from backend.home_state_models import DeviceType, ActionType, Action, HomeStateRequest
-    IMPORTS_AVAILABLE = True
-except ImportError as e:
-    print(f"❌ Import error: {e}")
-    IMPORTS_AVAILABLE = False
+    from pydantic import BaseModel
+    # Devices shown after each state-evolution step, resolved once
+    _TRACKED_DEVICES = (DeviceType.THERMOSTAT, DeviceType.BATTERY)
+
+# A day's worth of (time period, conditions) steps for the state evolution test
+_DAY_SCENARIOS = tuple(
+    (time_period, types.MappingProxyType(conditions))
+    for time_period, conditions in [
+        ("Morning (6 AM)", {"temperature": 65.0, "grid_stability": "stable", "energy_price": 25.0}),
+        ("Midday (12 PM)", {"temperature": 85.0, "grid_stability": "stable", "energy_price": 45.0}),
+        ("Afternoon Peak (4 PM)", {"temperature": 95.0, "grid_stability": "stressed", "energy_price": 85.0}),
+        ("Evening (8 PM)", {"temperature": 80.0, "grid_stability": "stable", "energy_price": 35.0}),
+        ("Night (11 PM)", {"temperature": 70.0, "grid_stability": "stable", "energy_price": 20.0}),
+    ]
+)
+
+def _request_for(actions):
+    """Wrap already-validated actions in a HomeStateRequest without re-running validation"""
+    return HomeStateRequest.model_construct(actions=actions)
+
+class _ResultSummary(NamedTuple):
+    """The parts of a HomeStateResult that the scenario analysis reads"""
+    success: bool
+    processing_time_ms: Optional[float]
+
+# Serializer per logged type, resolved once so repeat logging skips the type probing
+_SERIALIZERS = weakref.WeakKeyDictionary()
+
+def _serialize(obj):
+    """Convert a logged object to plain data via a per-type cached serializer"""
+    cls = type(obj)
+    serializer = _SERIALIZERS.get(cls)
+    if serializer is None:
+        if issubclass(cls, BaseModel):
+            serializer = operator.methodcaller("model_dump", mode="python")
+        elif dataclasses.is_dataclass(cls):
+            serializer = dataclasses.asdict
+        else:
+            serializer = str
+        _SERIALIZERS[cls] = serializer
+    return serializer(obj)
+
+# Decision tables for the scenario actions, as create_*_action keyword arguments.
+# Thermostat settings are indexed by temperature band (<65, 65-80, 80-90, >90);
+# battery settings by grid stability, then by price band (<=60, >60).
+_THERMOSTAT_SETTINGS = (
+    {"temperature": 70, "mode": "heat"},
+    None,
+    {"temperature": 72, "mode": "cool"},
+    {"temperature": 68, "mode": "cool"},
+)
+_BATTERY_SETTINGS = {
+    "outage": ({"soc_percent": 95, "backup_reserve": 25},) * 2,
+    "stressed": ({"soc_percent": 80, "backup_reserve": 30},) * 2,
+}
+_DEFAULT_BATTERY_SETTINGS = (
+    {"soc_percent": 75, "backup_reserve": 20},
+    {"soc_percent": 60, "backup_reserve": 15},
+)
+
+@functools.lru_cache(maxsize=64)
+def _action_template(temp_band, grid_stability, price_band):
+    """Build the action set for one cell of the (temperature band, grid, price band) table"""
+    thermostat = _THERMOSTAT_SETTINGS[temp_band]
+    battery = _BATTERY_SETTINGS.get(grid_stability, _DEFAULT_BATTERY_SETTINGS)[price_band]
+    if thermostat is None:
+        return (create_battery_action(**battery),)
+    return (create_thermostat_action(**thermostat), create_battery_action(**battery))
 
 class DynamicScenarioSimulator:
     """Simulates changing conditions and tests agent's dynamic response"""
     
     def __init__(self):
         self.agent = None
-        self.scenario_log = []
+        # Entries stream to SCENARIO_LOG_FILE; only running tallies and the last few stay in memory
+        self._log_fp = None
+        self._scenario_count = 0
+        self._success_count = 0
+        self._action_counts = Counter()
+        self._recent_scenarios = deque(maxlen=3)
+        # Log entries carry monotonic offsets; wall-clock times are derived from this base when printed
+        self._t0_ns = time.monotonic_ns()
+        self._wall0 = datetime.now()
         self.current_conditions = {
             "temperature": 75.0,
             "grid_stability": "stable",
@@ -44,6 +159,12 @@ class DynamicScenarioSimulator:
             print("❌ Cannot initialize agent - imports not available")
             return False
         
+        try:
+            _import_backend()
+        except ImportError as e:
+            print(f"❌ Import error: {e}")
+            return False
+        
         try:
             self.agent = HomeStateAgent()
             print("✅ Home State Agent initialized")
@@ -54,13 +175,31 @@ class DynamicScenarioSimulator:
     
     def log_scenario(self, step: str, conditions: dict, actions: list, result=None):
         """Log a scenario step for analysis"""
-        self.scenario_log.append({
-            "timestamp": datetime.now().isoformat(),
+        summary = _ResultSummary(result.success, result.processing_time_ms) if result else None
+        entry = {
+            "t_ns": time.monotonic_ns() - self._t0_ns,
             "step": step,
             "conditions": conditions.copy(),
-            "actions": [action.__dict__ if hasattr(action, '__dict__') else str(action) for action in actions],
-            "result": result.__dict__ if result and hasattr(result, '__dict__') else str(result) if result else None
-        })
+            "actions": [_serialize(action) for action in actions],
+            "result": summary._asdict() if summary else None
+        }
+        if self._log_fp is not None:
+            self._log_fp.write(_json_line(entry))
+        
+        self._scenario_count += 1
+        self._success_count += bool(summary and summary.success)
+        self._action_counts.update(action.get("device_type", "unknown") for action in entry["actions"])
+        self._recent_scenarios.append((entry["t_ns"], step, summary))
+    
+    @contextlib.contextmanager
+    def scenario_log(self):
+        """Stream log_scenario entries to SCENARIO_LOG_FILE for the duration of the block"""
+        with open(SCENARIO_LOG_FILE, "wb") as log_fp:
+            self._log_fp = log_fp
+            try:
+                yield log_fp
+            finally:
+                self._log_fp = None
     
     def simulate_condition_change(self, **changes):
         """Simulate changing environmental conditions"""
@@ -73,36 +212,31 @@ class DynamicScenarioSimulator:
         print("🧪 TEST 1: DYNAMIC VALIDATION")
         print("="*60)
         
-        # Test 1: Try to set invalid temperature
-        print("\n1. Attempting to set temperature to 50°F (below minimum)...")
-        try:
-            invalid_action = create_thermostat_action(temperature=50.0)
-            request = HomeStateRequest([invalid_action])
-            result = await self.agent.process_request(request)
-            print(f"   Result: {result.success} - {result.message}")
-        except Exception as e:
-            print(f"   ❌ Validation caught: {e}")
-        
-        # Test 2: Try to set battery to 150% SOC
-        print("\n2. Attempting to set battery to 150% SOC...")
-        try:
-            invalid_action = create_battery_action(soc_percent=150.0)
-            request = HomeStateRequest([invalid_action])
-            result = await self.agent.process_request(request)
-            print(f"   Result: {result.success} - {result.message}")
-        except Exception as e:
-            print(f"   ❌ Validation caught: {e}")
+        # (heading, action factory, expected to pass validation)
+        checks = [
+            ("Attempting to set temperature to 50°F (below minimum)",
+             lambda: create_thermostat_action(temperature=50.0), False),
+            ("Attempting to set battery to 150% SOC",
+             lambda: create_battery_action(soc_percent=150.0), False),
+            ("Setting valid temperature (72°F)",
+             lambda: create_thermostat_action(temperature=72.0), True),
+        ]
         
-        # Test 3: Valid actions should work
-        print("\n3. Setting valid temperature (72°F)...")
-        try:
-            valid_action = create_thermostat_action(temperature=72.0)
-            request = HomeStateRequest([valid_action])
-            result = await self.agent.process_request(request)
-            print(f"   ✅ Valid action succeeded: {result.success}")
-            self.log_scenario("validation_test", self.current_conditions, [valid_action], result)
-        except Exception as e:
-            print(f"   ❌ Unexpected error: {e}")
+        # Checks run in order on the shared agent, since a valid action changes its state
+        for i, (heading, make_action, valid) in enumerate(checks, 1):
+            print(f"\n{i}. {heading}...")
+            try:
+                action = make_action()
+                result = await self.agent.process_request(_request_for([action]))
+            except Exception as e:
+                print(f"   ❌ {'Unexpected error' if valid else 'Validation caught'}: {e}")
+                continue
+            
+            if valid:
+                print(f"   ✅ Valid action succeeded: {result.success}")
+                self.log_scenario("validation_test", self.current_conditions, [action], result)
+            else:
+                print(f"   Result: {result.success} - {result.message}")
     
     async def test_energy_optimization_dynamics(self):
         """Test dynamic energy optimization based on changing conditions"""
@@ -110,59 +244,36 @@ class DynamicScenarioSimulator:
         print("🧪 TEST 2: DYNAMIC ENERGY OPTIMIZATION")
         print("="*60)
         
-        # Scenario 1: Normal conditions
-        print("\n1. Normal conditions (75°F, stable grid, $35/MWh)...")
-        self.simulate_condition_change(temperature=75.0, grid_stability="stable", energy_price=35.0)
-        
-        try:
-            recommendations = await self.agent.optimize_energy_usage()
-            print(f"   Generated {len(recommendations)} optimization actions:")
-            for i, action in enumerate(recommendations, 1):
-                print(f"     {i}. {action.device_type}: {action.parameters}")
-            
-            if recommendations:
-                request = HomeStateRequest(recommendations)
-                result = await self.agent.process_request(request)
-                print(f"   ✅ Optimization executed: {result.success}")
-                self.log_scenario("normal_optimization", self.current_conditions, recommendations, result)
-        except Exception as e:
-            print(f"   ❌ Optimization failed: {e}")
-        
-        # Scenario 2: Heat wave conditions
-        print("\n2. Heat wave conditions (105°F, stressed grid, $95/MWh)...")
-        self.simulate_condition_change(temperature=105.0, grid_stability="stressed", energy_price=95.0)
-        
-        try:
-            recommendations = await self.agent.optimize_energy_usage()
-            print(f"   Generated {len(recommendations)} heat wave actions:")
-            for i, action in enumerate(recommendations, 1):
-                print(f"     {i}. {action.device_type}: {action.parameters}")
-            
-            if recommendations:
-                request = HomeStateRequest(recommendations)
-                result = await self.agent.process_request(request)
-                print(f"   ✅ Heat wave response executed: {result.success}")
-                self.log_scenario("heat_wave_optimization", self.current_conditions, recommendations, result)
-        except Exception as e:
-            print(f"   ❌ Heat wave optimization failed: {e}")
-        
-        # Scenario 3: Grid outage
-        print("\n3. Grid outage conditions (88°F, outage, $0/MWh)...")
-        self.simulate_condition_change(temperature=88.0, grid_stability="outage", energy_price=0.0)
+        # (log step, heading, action label, failure label, success label, condition changes)
+        scenarios = [
+            ("normal_optimization", "Normal conditions (75°F, stable grid, $35/MWh)",
+             "optimization", "Optimization", "Optimization executed",
+             {"temperature": 75.0, "grid_stability": "stable", "energy_price": 35.0}),
+            ("heat_wave_optimization", "Heat wave conditions (105°F, stressed grid, $95/MWh)",
+             "heat wave", "Heat wave optimization", "Heat wave response executed",
+             {"temperature": 105.0, "grid_stability": "stressed", "energy_price": 95.0}),
+            ("outage_optimization", "Grid outage conditions (88°F, outage, $0/MWh)",
+             "outage response", "Outage optimization", "Outage response executed",
+             {"temperature": 88.0, "grid_stability": "outage", "energy_price": 0.0}),
+        ]
         
-        try:
-            recommendations = await self.agent.optimize_energy_usage()
-            print(f"   Generated {len(recommendations)} outage response actions:")
-            for i, action in enumerate(recommendations, 1):
-                print(f"     {i}. {action.device_type}: {action.parameters}")
+        # Scenarios run in order on the shared agent: each one starts from the state the previous one left
+        for i, (step, heading, action_label, failure_label, success_label, changes) in enumerate(scenarios, 1):
+            print(f"\n{i}. {heading}...")
+            self.simulate_condition_change(**changes)
             
-            if recommendations:
-                request = HomeStateRequest(recommendations)
-                result = await self.agent.process_request(request)
-                print(f"   ✅ Outage response executed: {result.success}")
-                self.log_scenario("outage_optimization", self.current_conditions, recommendations, result)
-        except Exception as e:
-            print(f"   ❌ Outage optimization failed: {e}")
+            try:
+                recommendations = await self.agent.optimize_energy_usage()
+                print(f"   Generated {len(recommendations)} {action_label} actions:")
+                for j, action in enumerate(recommendations, 1):
+                    print(f"     {j}. {action.device_type}: {action.parameters}")
+                
+                if recommendations:
+                    result = await self.agent.process_request(_request_for(recommendations))
+                    print(f"   ✅ {success_label}: {result.success}")
+                    self.log_scenario(step, self.current_conditions, recommendations, result)
+            except Exception as e:
+                print(f"   ❌ {failure_label} failed: {e}")
     
     async def test_state_evolution_dynamics(self):
         """Test how agent state evolves over time with multiple interactions"""
@@ -170,17 +281,11 @@ class DynamicScenarioSimulator:
         print("🧪 TEST 3: STATE EVOLUTION DYNAMICS")
         print("="*60)
         
-        # Simulate a day's worth of interactions
-        scenarios = [
-            ("Morning (6 AM)", {"temperature": 65.0, "grid_stability": "stable", "energy_price": 25.0}),
-            ("Midday (12 PM)", {"temperature": 85.0, "grid_stability": "stable", "energy_price": 45.0}),
-            ("Afternoon Peak (4 PM)", {"temperature": 95.0, "grid_stability": "stressed", "energy_price": 85.0}),
-            ("Evening (8 PM)", {"temperature": 80.0, "grid_stability": "stable", "energy_price": 35.0}),
-            ("Night (11 PM)", {"temperature": 70.0, "grid_stability": "stable", "energy_price": 20.0}),
-        ]
+        processing_times = []
         
-        for time_period, conditions in scenarios:
-            print(f"\n{time_period}: {conditions}")
+        # Simulate a day's worth of interactions
+        for time_period, conditions in _DAY_SCENARIOS:
+            print(f"\n{time_period}: {dict(conditions)}")
             self.simulate_condition_change(**conditions)
             
             try:
@@ -188,18 +293,18 @@ class DynamicScenarioSimulator:
                 actions = self._generate_actions_for_conditions(conditions)
                 
                 if actions:
-                    request = HomeStateRequest(actions)
+                    request = _request_for(actions)
                     result = await self.agent.process_request(request)
                     
                     print(f"   Actions: {len(actions)}")
                     print(f"   Success: {result.success}")
                     print(f"   Processing Time: {result.processing_time_ms:.2f}ms")
+                    processing_times.append(result.processing_time_ms)
                     
-                    # Show current state
-                    current_state = self.agent.get_current_state()
+                    # Show current state, as returned with the result
                     print(f"   Current State:")
-                    for device_type in [DeviceType.THERMOSTAT, DeviceType.BATTERY]:
-                        device = current_state.get_device(device_type)
+                    for device_type in _TRACKED_DEVICES:
+                        device = result.home_state.get_device(device_type)
                         if device:
                             print(f"     {device_type.value}: {device.properties}")
                     
@@ -207,33 +312,29 @@ class DynamicScenarioSimulator:
                 
             except Exception as e:
                 print(f"   ❌ Error: {e}")
+        
+        if processing_times:
+            print(f"\n   Average Processing Time: {statistics.fmean(processing_times):.2f}ms over {len(processing_times)} steps")
     
     def _generate_actions_for_conditions(self, conditions):
         """Generate appropriate actions based on current conditions"""
-        actions = []
         temp = conditions.get("temperature", 75)
         grid_stability = conditions.get("grid_stability", "stable")
         energy_price = conditions.get("energy_price", 35)
         
-        # Thermostat logic
         if temp > 90:
-            actions.append(create_thermostat_action(temperature=68, mode="cool"))
+            temp_band = 3
         elif temp > 80:
-            actions.append(create_thermostat_action(temperature=72, mode="cool"))
+            temp_band = 2
         elif temp < 65:
-            actions.append(create_thermostat_action(temperature=70, mode="heat"))
-        
-        # Battery logic
-        if grid_stability == "outage":
-            actions.append(create_battery_action(soc_percent=95, backup_reserve=25))
-        elif grid_stability == "stressed":
-            actions.append(create_battery_action(soc_percent=80, backup_reserve=30))
-        elif energy_price > 60:
-            actions.append(create_battery_action(soc_percent=60, backup_reserve=15))
+            temp_band = 0
         else:
-            actions.append(create_battery_action(soc_percent=75, backup_reserve=20))
+            temp_band = 1
+        price_band = 1 if energy_price > 60 else 0
         
-        return actions
+        # Hand out copies, since requests may mutate their actions downstream
+        template = _action_template(temp_band, grid_stability, price_band)
+        return [action.model_copy(deep=True) for action in template]
     
     async def test_predictive_capabilities(self):
         """Test agent's predictive capabilities"""
@@ -241,21 +342,28 @@ class DynamicScenarioSimulator:
         print("🧪 TEST 4: PREDICTIVE CAPABILITIES")
         print("="*60)
         
-        try:
-            # Get energy prediction
-            prediction = await self.agent.predict_energy_needs(24)
-            print(f"📊 24-hour Energy Prediction:")
-            print(f"   {json.dumps(prediction, indent=2)}")
-            
-            # Get intelligent recommendations
-            recommendations = await self.agent.get_intelligent_recommendations(
+        async def recommend():
+            # Looked up inside the task so a missing method fails only this half
+            return await self.agent.get_intelligent_recommendations(
                 "The weather forecast shows extreme heat tomorrow. How should I prepare?"
             )
+        
+        # The prediction and the recommendations are independent, so both requests overlap
+        prediction, recommendations = await asyncio.gather(
+            self.agent.predict_energy_needs(24), recommend(), return_exceptions=True
+        )
+        
+        if isinstance(prediction, Exception):
+            print(f"❌ Energy prediction failed: {prediction}")
+        else:
+            print(f"📊 24-hour Energy Prediction:")
+            print(f"   {_json_pretty(prediction)}")
+        
+        if isinstance(recommendations, Exception):
+            print(f"\n❌ AI recommendations failed: {recommendations}")
+        else:
             print(f"\n🤖 AI Recommendations:")
             print(f"   {recommendations}")
-            
-        except Exception as e:
-            print(f"❌ Predictive capabilities test failed: {e}")
     
     def analyze_scenario_log(self):
         """Analyze the logged scenarios to show dynamic behavior"""
@@ -263,34 +371,44 @@ class DynamicScenarioSimulator:
         print("📊 DYNAMIC BEHAVIOR ANALYSIS")
         print("="*60)
         
-        if not self.scenario_log:
+        total = self._scenario_count
+        if not total:
             print("No scenarios logged for analysis")
             return
         
-        print(f"\nTotal scenarios executed: {len(self.scenario_log)}")
+        print(f"\nTotal scenarios executed: {total}")
+        print(f"Full scenario log: {SCENARIO_LOG_FILE}")
         
         # Analyze action patterns
-        action_counts = {}
-        for scenario in self.scenario_log:
-            for action in scenario["actions"]:
-                device_type = action.get("device_type", "unknown")
-                action_counts[device_type] = action_counts.get(device_type, 0) + 1
-        
         print(f"\nAction distribution:")
-        for device_type, count in action_counts.items():
+        for device_type, count in self._action_counts.items():
             print(f"  {device_type}: {count} actions")
         
         # Analyze success rates
-        successful_scenarios = sum(1 for s in self.scenario_log if s["result"] and s["result"].get("success", False))
-        print(f"\nSuccess rate: {successful_scenarios}/{len(self.scenario_log)} ({successful_scenarios/len(self.scenario_log)*100:.1f}%)")
+        successful_scenarios = self._success_count
+        print(f"\nSuccess rate: {successful_scenarios}/{total} ({successful_scenarios/total*100:.1f}%)")
         
         # Show state evolution
         print(f"\nState evolution over time:")
-        for i, scenario in enumerate(self.scenario_log[-3:], 1):  # Last 3 scenarios
-            print(f"  Scenario {i} ({scenario['step']}):")
-            if scenario["result"]:
-                print(f"    Success: {scenario['result'].get('success', False)}")
-                print(f"    Processing Time: {scenario['result'].get('processing_time_ms', 0):.2f}ms")
+        for i, (t_ns, step, summary) in enumerate(self._recent_scenarios, 1):  # Last 3 scenarios
+            logged_at = self._wall0 + timedelta(microseconds=t_ns // 1000)
+            print(f"  Scenario {i} ({step}) at {logged_at.isoformat()}:")
+            if summary:
+                print(f"    Success: {summary.success}")
+                print(f"    Processing Time: {summary.processing_time_ms or 0:.2f}ms")
+
+async def _run_section(section):
+    """Run one test section, buffering its output and writing it in a single call"""
+    if VERBOSE:
+        await section()
+        return
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            await section()
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
 
 async def main():
     """Run all dynamic tests"""
@@ -304,11 +422,15 @@ async def main():
     if not await simulator.setup_agent():
         return
     
-    # Run all tests
-    await simulator.test_validation_dynamics()
-    await simulator.test_energy_optimization_dynamics()
-    await simulator.test_state_evolution_dynamics()
-    await simulator.test_predictive_capabilities()
+    with simulator.scenario_log():
+        # Run all tests
+        for section in (
+            simulator.test_validation_dynamics,
+            simulator.test_energy_optimization_dynamics,
+            simulator.test_state_evolution_dynamics,
+            simulator.test_predictive_capabilities,
+        ):
+            await _run_section(section)
     
     # Analyze results
     simulator.analyze_scenario_log()
@@ -322,4 +444,10 @@ async def main():
     print(f"  ✅ Context-aware decision making")
 
 if __name__ == "__main__":
+    # Faster event loop where available; the stdlib loop is the fallback
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -9,12 +9,17 @@ End-to-end test to verify the complete threat-to-action-to-call flow:
 """
 
 import asyncio
+import itertools
 import json
+import logging
 import sys
 from pathlib import Path
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Any
 
+logger = logging.getLogger(__name__)
+
 # Add the backend directory to the path
 sys.path.append(str(Path(__file__).parent / "services" / "backend" / "src"))
 
@@ -119,12 +124,55 @@ class HomeStateResult:
             "processing_time_ms": self.processing_time_ms
         }
 
+@dataclass(frozen=True, slots=True)
+class ActionResult:
+    action: Action
+    success: bool
+    message: str
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+@dataclass(frozen=True, slots=True)
+class ThreatRequest:
+    location: str
+    include_weather: bool
+    include_grid: bool
+    include_research: bool
+    request_id: str
+
+@dataclass(frozen=True, slots=True)
+class MockThreatResult:
+    success: bool
+    analysis: ThreatAnalysis
+    message: str = "Success"
+
+@dataclass(frozen=True, slots=True)
+class WeatherEvent:
+    event_type: str
+    probability: float
+    severity: str
+    predicted_time: str
+    description: str
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    alert_type: str
+    weather_event: WeatherEvent
+    message: str
+    action_required: bool
+    homeowner_consent: bool
+
+@dataclass(frozen=True, slots=True)
+class Homeowner:
+    name: str
+    phone_number: str
+    id: str
+
 class MockThreatAssessmentAgent:
     """Mock threat assessment agent that simulates threat analysis"""
     
     async def analyze_threats(self, request):
         """Mock threat analysis"""
-        print(f"🔍 Mock Threat Assessment: Analyzing threats for {request.location}")
+        logger.info("🔍 Mock Threat Assessment: Analyzing threats for %s", request.location)
         
         # Simulate different threat scenarios based on location
         if "Austin" in request.location:
@@ -172,14 +220,35 @@ class MockThreatAssessmentAgent:
                 data_sources=["grid_api"]
             )
         
-        class MockThreatResult:
-            def __init__(self, success, analysis, message="Success"):
-                self.success = success
-                self.analysis = analysis
-                self.message = message
-        
         return MockThreatResult(True, threat_analysis, "Threat analysis completed successfully")
 
+def _apply_thermostat(state, params):
+    """Apply thermostat action parameters to the mock home state"""
+    thermostat = state["devices"]["thermostat"]
+    if "temperature_f" in params:
+        thermostat["temperature_f"] = params["temperature_f"]
+    if "mode" in params:
+        thermostat["mode"] = params["mode"]
+
+def _apply_battery(state, params):
+    """Apply battery action parameters to the mock home state"""
+    battery = state["devices"]["battery"]
+    if "soc_percent" in params:
+        battery["soc_percent"] = params["soc_percent"]
+    if "backup_reserve_percent" in params:
+        battery["backup_reserve_percent"] = params["backup_reserve_percent"]
+
+def _apply_grid(state, params):
+    """Apply grid action parameters, including simulated energy sales, to the mock home state"""
+    if "connection_status" in params:
+        state["devices"]["grid"]["connection_status"] = params["connection_status"]
+    if "sell_energy_kwh" in params:
+        # Simulate energy sale
+        energy_sold = params["sell_energy_kwh"]
+        rate = params.get("rate_usd_per_kwh", 1.0)
+        profit = energy_sold * rate
+        state["financials"]["profit_today_usd"] += profit
+
 class MockHomeStateAgent:
     """Mock home state agent that simulates action generation and execution"""
     
@@ -195,6 +264,11 @@ class MockHomeStateAgent:
             "financials": {"profit_today_usd": 0.0}
         }
         self.action_history = []
+        self._handlers = {
+            DeviceType.THERMOSTAT: _apply_thermostat,
+            DeviceType.BATTERY: _apply_battery,
+            DeviceType.GRID: _apply_grid,
+        }
     
     def get_current_state(self):
         """Get current home state"""
@@ -202,12 +276,13 @@ class MockHomeStateAgent:
     
     async def generate_intelligent_actions(self, threat_analysis):
         """Generate intelligent actions based on threat analysis"""
-        print(f"🤖 Mock Home State Agent: Generating actions for {threat_analysis.overall_threat_level} threat")
+        logger.info("🤖 Mock Home State Agent: Generating actions for %s threat", threat_analysis.overall_threat_level)
         
         actions = []
+        threat_types = frozenset(threat_analysis.threat_types)
         
         # Generate actions based on threat type and level
-        if "heat_wave" in [t for t in threat_analysis.threat_types]:
+        if "heat_wave" in threat_types:
             if threat_analysis.overall_threat_level in ["high", "critical"]:
                 # High heat wave - aggressive cooling and battery backup
                 actions.extend([
@@ -237,7 +312,7 @@ class MockHomeStateAgent:
                     )
                 ])
         
-        elif "grid_strain" in [t for t in threat_analysis.threat_types]:
+        elif "grid_strain" in threat_types:
             # Grid strain - prepare for backup
             actions.extend([
                 Action(
@@ -252,51 +327,36 @@ class MockHomeStateAgent:
                 )
             ])
         
-        print(f"   Generated {len(actions)} intelligent actions")
-        for i, action in enumerate(actions, 1):
-            print(f"     {i}. {action.device_type.upper()}: {action.action_type} - {action.parameters}")
+        logger.info("   Generated %d intelligent actions", len(actions))
+        if logger.isEnabledFor(logging.INFO):
+            for i, action in enumerate(actions, 1):
+                logger.info("     %s. %s: %s - %s", i, action.device_type.upper(), action.action_type, action.parameters)
         
         return actions
     
     async def process_request(self, request):
         """Process home state request and execute actions"""
-        print(f"⚡ Mock Home State Agent: Executing {len(request.actions)} actions")
+        logger.info("⚡ Mock Home State Agent: Executing %d actions", len(request.actions))
+        
+        state = self.current_state
         
         # Simulate action execution
         action_results = []
         for action in request.actions:
-            print(f"   Executing: {action.device_type.upper()} - {action.action_type}")
+            device_type = action.device_type
+            logger.info("   Executing: %s - %s", device_type.upper(), action.action_type)
             
-            # Update home state based on action
-            if action.device_type == DeviceType.THERMOSTAT:
-                if "temperature_f" in action.parameters:
-                    self.current_state["devices"]["thermostat"]["temperature_f"] = action.parameters["temperature_f"]
-                if "mode" in action.parameters:
-                    self.current_state["devices"]["thermostat"]["mode"] = action.parameters["mode"]
-            
-            elif action.device_type == DeviceType.BATTERY:
-                if "soc_percent" in action.parameters:
-                    self.current_state["devices"]["battery"]["soc_percent"] = action.parameters["soc_percent"]
-                if "backup_reserve_percent" in action.parameters:
-                    self.current_state["devices"]["battery"]["backup_reserve_percent"] = action.parameters["backup_reserve_percent"]
-            
-            elif action.device_type == DeviceType.GRID:
-                if "connection_status" in action.parameters:
-                    self.current_state["devices"]["grid"]["connection_status"] = action.parameters["connection_status"]
-                if "sell_energy_kwh" in action.parameters:
-                    # Simulate energy sale
-                    energy_sold = action.parameters["sell_energy_kwh"]
-                    rate = action.parameters.get("rate_usd_per_kwh", 1.0)
-                    profit = energy_sold * rate
-                    self.current_state["financials"]["profit_today_usd"] += profit
+            # Update home state based on action; unknown device types leave it unchanged
+            handler = self._handlers.get(device_type)
+            if handler is not None:
+                handler(state, action.parameters)
             
             # Create action result
-            action_result = type('ActionResult', (), {
-                'action': action,
-                'success': True,
-                'message': f"Successfully executed {action.action_type} on {action.device_type}",
-                'timestamp': datetime.utcnow()
-            })()
+            action_result = ActionResult(
+                action=action,
+                success=True,
+                message=f"Successfully executed {action.action_type} on {action.device_type}"
+            )
             action_results.append(action_result)
         
         # Store action history
@@ -312,8 +372,8 @@ class MockHomeStateAgent:
             processing_time_ms=150.0
         )
         
-        print(f"   ✅ All actions executed successfully")
-        print(f"   📊 Updated home state: {self.current_state}")
+        logger.info("   ✅ All actions executed successfully")
+        logger.info("   📊 Updated home state: %s", self.current_state)
         
         return result
 
@@ -322,15 +382,18 @@ class MockVoiceService:
     
     def __init__(self):
         self.call_history = []
+        # Call IDs are a per-service base timestamp plus a counter, unique even within one second
+        self._base_ts = int(datetime.utcnow().timestamp())
+        self._call_counter = itertools.count()
     
     async def send_warning_call(self, alert, phone_number):
         """Mock warning call"""
-        print(f"📞 Mock Warning Call: Calling {phone_number}")
-        print(f"   Alert: {alert.message if hasattr(alert, 'message') else 'Heat wave warning'}")
+        logger.info("📞 Mock Warning Call: Calling %s", phone_number)
+        logger.info("   Alert: %s", alert.message if hasattr(alert, 'message') else 'Heat wave warning')
         
         call_result = {
             "success": True,
-            "call_id": f"warning_{int(datetime.utcnow().timestamp())}",
+            "call_id": f"warning_{self._base_ts}_{next(self._call_counter)}",
             "message": "Warning call sent successfully"
         }
         
@@ -345,15 +408,15 @@ class MockVoiceService:
     
     async def send_resolution_call(self, phone_number, home_state):
         """Mock resolution call"""
-        print(f"📞 Mock Resolution Call: Calling {phone_number}")
+        logger.info("📞 Mock Resolution Call: Calling %s", phone_number)
         
         # Extract profit from home state
         profit = home_state.get("financials", {}).get("profit_today_usd", 0.0)
-        print(f"   Reporting profit: ${profit:.2f}")
+        logger.info("   Reporting profit: $%.2f", profit)
         
         call_result = {
             "success": True,
-            "call_id": f"resolution_{int(datetime.utcnow().timestamp())}",
+            "call_id": f"resolution_{self._base_ts}_{next(self._call_counter)}",
             "message": f"Resolution call sent successfully. Profit: ${profit:.2f}"
         }
         
@@ -366,45 +429,139 @@ class MockVoiceService:
         })
         
         return call_result
+    
+    async def send_warning_calls_bulk(self, alerts_phones):
+        """Mock multi-recipient warning submission: one request for the whole batch"""
+        logger.info("📦 Mock Bulk Warning Request: %d recipients", len(alerts_phones))
+        return [await self.send_warning_call(alert, phone_number) for alert, phone_number in alerts_phones]
+    
+    async def send_resolution_calls_bulk(self, phones_states):
+        """Mock multi-recipient resolution submission: one request for the whole batch"""
+        logger.info("📦 Mock Bulk Resolution Request: %d recipients", len(phones_states))
+        return [await self.send_resolution_call(phone_number, home_state) for phone_number, home_state in phones_states]
+
+class VoiceCallBatcher:
+    """
+    Coalesces individual call requests into bulk voice-service submissions.
+    A batch is flushed when it reaches max_batch_size or max_queue_time after its first request;
+    each caller still awaits its own result.
+    """
+    
+    def __init__(self, send_bulk, max_batch_size: int = 50, max_queue_time: float = 0.1):
+        self._send_bulk = send_bulk
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._pending = []
+        self._flush_handle = None
+        self._batches = set()
+    
+    async def submit(self, payload):
+        """Queue one call payload and wait for its result from the batch it lands in"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._process_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _process_batch(self, batch):
+        try:
+            results = await self._send_bulk([payload for payload, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Bulk call returned {len(results)} results for {len(batch)} requests")
+        except BaseException as e:
+            # Resolve every waiter, including on cancellation, so no caller hangs forever
+            for _, future in batch:
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+def _call_record(homeowner, phone_number, call_result):
+    """Summarize one homeowner's call result, turning a raised exception into a failed call"""
+    if isinstance(call_result, Exception):
+        call_result = {"success": False, "message": str(call_result)}
+    return {
+        "homeowner": homeowner.name,
+        "phone_number": phone_number,
+        "success": call_result.get("success", False),
+        "call_id": call_result.get("call_id"),
+        "message": call_result.get("message")
+    }
 
 class MockAgentOrchestrator:
     """Mock agent orchestrator that coordinates the complete flow"""
     
-    def __init__(self):
+    def __init__(self, max_call_concurrency: int = 64, simulate_latency: bool = False,
+                 simulated_delay_s: float = 1.0):
+        # Real call-answer waits are opt-in; by default the pipeline only yields to the loop
+        self.simulate_latency = simulate_latency
+        self.simulated_delay_s = simulated_delay_s
+        # Caps in-flight bulk voice requests; a finished request immediately frees its slot.
+        # Taken per batch send, not per queued call, so waiting calls never block a batch from filling
+        self._call_semaphore = asyncio.Semaphore(max_call_concurrency)
         self.threat_agent = MockThreatAssessmentAgent()
         self.home_agent = MockHomeStateAgent()
         self.voice_service = MockVoiceService()
+        self._warning_batcher = VoiceCallBatcher(
+            lambda payloads: self._bounded(self.voice_service.send_warning_calls_bulk(payloads))
+        )
+        self._resolution_batcher = VoiceCallBatcher(
+            lambda payloads: self._bounded(self.voice_service.send_resolution_calls_bulk(payloads))
+        )
         self.registered_homeowners = {
-            "+1234567890": type('Homeowner', (), {
-                'name': 'John Doe',
-                'phone_number': '+1234567890',
-                'id': '1'
-            })(),
-            "+1987654321": type('Homeowner', (), {
-                'name': 'Jane Smith', 
-                'phone_number': '+1987654321',
-                'id': '2'
-            })()
+            "+1234567890": Homeowner(name='John Doe', phone_number='+1234567890', id='1'),
+            "+1987654321": Homeowner(name='Jane Smith', phone_number='+1987654321', id='2')
         }
     
+    async def _simulated_wait(self):
+        """Stand in for waiting on homeowners; only sleeps for real when simulating latency"""
+        await asyncio.sleep(self.simulated_delay_s if self.simulate_latency else 0)
+    
+    async def _bounded(self, call):
+        """Await a bulk voice request coroutine once a concurrency slot is free"""
+        async with self._call_semaphore:
+            return await call
+    
     async def process_threat_to_action(self, location: str, include_research: bool = False):
         """Complete threat-to-action pipeline with phone call integration"""
-        print(f"\n🚀 STARTING END-TO-END THREAT-TO-ACTION PIPELINE")
-        print(f"   Location: {location}")
-        print(f"   Registered Homeowners: {len(self.registered_homeowners)}")
+        logger.info("\n🚀 STARTING END-TO-END THREAT-TO-ACTION PIPELINE")
+        logger.info("   Location: %s", location)
+        logger.info("   Registered Homeowners: %d", len(self.registered_homeowners))
         
         start_time = datetime.utcnow()
+        run_ts = int(start_time.timestamp())
         
         try:
             # Step 1: Threat Assessment
-            print(f"\n🔍 Step 1: Analyzing threats for {location}")
-            threat_request = type('ThreatRequest', (), {
-                'location': location,
-                'include_weather': True,
-                'include_grid': True,
-                'include_research': include_research,
-                'request_id': f"orchestrator_{int(datetime.utcnow().timestamp())}"
-            })()
+            logger.info("\n🔍 Step 1: Analyzing threats for %s", location)
+            threat_request = ThreatRequest(
+                location=location,
+                include_weather=True,
+                include_grid=True,
+                include_research=include_research,
+                request_id=f"orchestrator_{run_ts}"
+            )
             
             threat_result = await self.threat_agent.analyze_threats(threat_request)
             
@@ -419,51 +576,53 @@ class MockAgentOrchestrator:
                     "resolution_calls": []
                 }
             
-            print(f"   ✅ Threat analysis completed: {threat_result.analysis.overall_threat_level} level")
-            print(f"   📊 Threat types: {[t for t in threat_result.analysis.threat_types]}")
+            logger.info("   ✅ Threat analysis completed: %s level", threat_result.analysis.overall_threat_level)
+            threat_types = frozenset(threat_result.analysis.threat_types)
+            logger.info("   📊 Threat types: %s", list(threat_result.analysis.threat_types))
             
             # Step 2: Send Warning Calls (if high threat level and homeowners registered)
             warning_calls = []
             if (threat_result.analysis.overall_threat_level in ["high", "critical"] 
                 and self.registered_homeowners):
                 
-                print(f"\n📞 Step 2: Sending warning calls to {len(self.registered_homeowners)} homeowners")
+                logger.info("\n📞 Step 2: Sending warning calls to %d homeowners", len(self.registered_homeowners))
                 
                 # Create weather event for alert
-                weather_event = type('WeatherEvent', (), {
-                    'event_type': "heatwave" if "heat_wave" in [t for t in threat_result.analysis.threat_types] else "storm",
-                    'probability': threat_result.analysis.confidence_score * 100,
-                    'severity': threat_result.analysis.overall_threat_level,
-                    'predicted_time': "4 PM today",
-                    'description': f"Our analyst agents have detected a {threat_result.analysis.confidence_score*100:.0f}% probability of a grid-straining heatwave event at 4 pm today."
-                })()
+                weather_event = WeatherEvent(
+                    event_type="heatwave" if "heat_wave" in threat_types else "storm",
+                    probability=threat_result.analysis.confidence_score * 100,
+                    severity=threat_result.analysis.overall_threat_level,
+                    predicted_time="4 PM today",
+                    description=f"Our analyst agents have detected a {threat_result.analysis.confidence_score*100:.0f}% probability of a grid-straining heatwave event at 4 pm today."
+                )
                 
-                # Send warning calls to all registered homeowners
+                # Every homeowner gets the same alert, so build it once
+                alert = Alert(
+                    alert_type="warning",
+                    weather_event=weather_event,
+                    message=f"Our analyst agents have detected a {threat_result.analysis.confidence_score*100:.0f}% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?",
+                    action_required=True,
+                    homeowner_consent=False
+                )
+                
+                # Send warning calls to all registered homeowners concurrently
+                calls = []
                 for phone_number, homeowner in self.registered_homeowners.items():
-                    alert = type('Alert', (), {
-                        'alert_type': "warning",
-                        'weather_event': weather_event,
-                        'message': f"Our analyst agents have detected a {threat_result.analysis.confidence_score*100:.0f}% probability of a grid-straining heatwave event at 4 pm today. Would you like us to prepare your home?",
-                        'action_required': True,
-                        'homeowner_consent': False
-                    })()
-                    
-                    print(f"   📞 Sending warning call to {homeowner.name} ({phone_number})")
-                    call_result = await self.voice_service.send_warning_call(alert, phone_number)
-                    warning_calls.append({
-                        "homeowner": homeowner.name,
-                        "phone_number": phone_number,
-                        "success": call_result.get("success", False),
-                        "call_id": call_result.get("call_id"),
-                        "message": call_result.get("message")
-                    })
+                    logger.info("   📞 Sending warning call to %s (%s)", homeowner.name, phone_number)
+                    calls.append(self._warning_batcher.submit((alert, phone_number)))
+                
+                call_results = await asyncio.gather(*calls, return_exceptions=True)
+                warning_calls = [
+                    _call_record(homeowner, phone_number, call_result)
+                    for (phone_number, homeowner), call_result in zip(self.registered_homeowners.items(), call_results)
+                ]
                 
                 # Wait for warning calls to be answered (simulated)
-                print("   ⏳ Waiting for warning calls to be answered...")
-                await asyncio.sleep(1)  # Simulated wait
+                logger.info("   ⏳ Waiting for warning calls to be answered...")
+                await self._simulated_wait()
             
             # Step 3: Generate Home Actions
-            print(f"\n🤖 Step 3: Generating intelligent home actions based on threats")
+            logger.info("\n🤖 Step 3: Generating intelligent home actions based on threats")
             home_actions = await self.home_agent.generate_intelligent_actions(threat_result.analysis)
             
             if not home_actions:
@@ -478,10 +637,10 @@ class MockAgentOrchestrator:
                 }
             
             # Step 4: Execute Home Actions
-            print(f"\n⚡ Step 4: Executing {len(home_actions)} intelligent home actions")
+            logger.info("\n⚡ Step 4: Executing %d intelligent home actions", len(home_actions))
             home_request = HomeStateRequest(
                 actions=home_actions,
-                request_id=f"orchestrator_home_{int(datetime.utcnow().timestamp())}"
+                request_id=f"orchestrator_home_{run_ts}"
             )
             
             home_result = await self.home_agent.process_request(home_request)
@@ -489,23 +648,23 @@ class MockAgentOrchestrator:
             # Step 5: Send Resolution Calls (if homeowners registered and actions were taken)
             resolution_calls = []
             if self.registered_homeowners and home_result.success:
-                print(f"\n📞 Step 5: Sending resolution calls to {len(self.registered_homeowners)} homeowners")
+                logger.info("\n📞 Step 5: Sending resolution calls to %d homeowners", len(self.registered_homeowners))
                 
                 # Wait a bit before sending resolution calls
-                print("   ⏳ Waiting before sending resolution calls...")
-                await asyncio.sleep(1)  # Simulated wait
+                logger.info("   ⏳ Waiting before sending resolution calls...")
+                await self._simulated_wait()
                 
-                # Send resolution calls to all registered homeowners
+                # Send resolution calls to all registered homeowners concurrently
+                calls = []
                 for phone_number, homeowner in self.registered_homeowners.items():
-                    print(f"   📞 Sending resolution call to {homeowner.name} ({phone_number})")
-                    call_result = await self.voice_service.send_resolution_call(phone_number, home_result.home_state)
-                    resolution_calls.append({
-                        "homeowner": homeowner.name,
-                        "phone_number": phone_number,
-                        "success": call_result.get("success", False),
-                        "call_id": call_result.get("call_id"),
-                        "message": call_result.get("message")
-                    })
+                    logger.info("   📞 Sending resolution call to %s (%s)", homeowner.name, phone_number)
+                    calls.append(self._resolution_batcher.submit((phone_number, home_result.home_state)))
+                
+                call_results = await asyncio.gather(*calls, return_exceptions=True)
+                resolution_calls = [
+                    _call_record(homeowner, phone_number, call_result)
+                    for (phone_number, homeowner), call_result in zip(self.registered_homeowners.items(), call_results)
+                ]
             
             processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
             
@@ -551,7 +710,7 @@ async def test_end_to_end_flow():
     print_separator("END-TO-END THREAT-TO-ACTION-TO-CALL FLOW TEST")
     
     # Initialize the orchestrator
-    orchestrator = MockAgentOrchestrator()
+    orchestrator = MockAgentOrchestrator(simulate_latency=False)
     
     print("Initial System State:")
     print(f"   Registered Homeowners: {len(orchestrator.registered_homeowners)}")
@@ -658,4 +817,6 @@ async def test_end_to_end_flow():
     print(f"   Final Profit: ${final_state.get('financials', {}).get('profit_today_usd', 0):.2f}")
 
 if __name__ == "__main__":
+    # Pipeline progress is logged; show it inline with the printed test report
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     asyncio.run(test_end_to_end_flow())